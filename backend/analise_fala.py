@@ -0,0 +1,234 @@
+"""Métricas de fala da entrevista, calculadas incrementalmente.
+
+Entrada: PCM 16 kHz int16 mono em blocos (enviados pelo navegador durante a
+chamada). Cada bloco vira quadros fixos de 20 ms, cuja energia é processada
+com NumPy em janelas fixas de `JANELA_Q` quadros (contadas desde o início da
+chamada, então o resultado não depende de como o áudio foi fatiado em
+blocos); o estado entre blocos é só um punhado de escalares, o resto
+(< 1 quadro), a janela em andamento e a cauda de energia para detecção de
+picos. Memória constante, seja a chamada de 1 minuto ou de 1 hora; finalizar
+é instantâneo.
+
+Heurísticas (sem transcrição):
+- voz: energia do quadro acima do piso de ruído adaptativo (por janela) + margem;
+- sílabas: picos locais de energia em quadros de voz, com espaçamento mínimo;
+- pausas: silêncio ≥ `PAUSA_MIN_S` entre dois trechos de voz;
+- hesitação ("éé", "hmm"): trecho de voz sustentado, com no máximo um pico
+  e energia estável;
+- variabilidade: desvio-padrão da energia (dB) nos quadros de voz.
+"""
+
+import math
+
+import numpy as np
+
+TAXA = 16_000
+QUADRO = TAXA // 50  # 20 ms
+QUADRO_S = QUADRO / TAXA
+PAUSA_MIN_S = 0.25
+PAUSA_LONGA_S = 2.0
+PICO_DIST_Q = 5  # 100 ms entre núcleos silábicos
+HESITACAO_MIN_Q = 15  # 300 ms
+HESITACAO_DESVIO_DB = 3.0
+SILABAS_POR_PALAVRA = 2.0  # média aproximada do português falado
+JANELA_Q = 100  # 2 s: o piso de ruído é atualizado uma vez por janela
+PISO_SUBIDA_DB = 0.5
+
+_PAUSA_MIN_Q = round(PAUSA_MIN_S / QUADRO_S)
+_PAUSA_LONGA_Q = round(PAUSA_LONGA_S / QUADRO_S)
+
+
+class AnaliseFala:
+    def __init__(self):
+        self._resto = np.zeros(0, dtype=np.int16)
+        self._janela_e = np.zeros(0, dtype=np.float32)  # energia (dB) da janela em andamento
+        self._cauda = np.zeros(0, dtype=np.float32)  # energia (dB) do último quadro
+        self._piso_db: float | None = None
+        self.quadros = 0
+        # Trecho (voz ou silêncio) em andamento
+        self._falando = False
+        self._run = 0
+        self._seg_picos = 0
+        self._seg_n = 0
+        self._seg_soma = 0.0
+        self._seg_soma2 = 0.0
+        self._ultimo_pico = -PICO_DIST_Q
+        # Acumuladores
+        self.voz_q = 0
+        self.silabas = 0
+        self.pausas = 0
+        self.pausa_total_q = 0
+        self.pausa_max_q = 0
+        self.pausas_longas = 0
+        self.hesitacoes = 0
+        self.hesitacao_q = 0
+        self._n = 0
+        self._media = 0.0
+        self._m2 = 0.0
+
+    # ---------- ingestão ----------
+    def alimentar(self, pcm: np.ndarray) -> None:
+        x = np.concatenate((self._resto, pcm)) if len(self._resto) else pcm
+        n = len(x) // QUADRO
+        self._resto = x[n * QUADRO:].copy()
+        if n == 0:
+            return
+        quadros = x[: n * QUADRO].reshape(n, QUADRO).astype(np.float32) / 32768.0
+        energia = 10.0 * np.log10(np.einsum("ij,ij->i", quadros, quadros) / QUADRO + 1e-10)
+        pendente = np.concatenate((self._janela_e, energia))
+        completas = len(pendente) // JANELA_Q
+        for j in range(completas):
+            self._janela(pendente[j * JANELA_Q:(j + 1) * JANELA_Q])
+        self._janela_e = pendente[completas * JANELA_Q:].copy()
+
+    def _janela(self, energia: np.ndarray) -> None:
+        n = len(energia)
+        # Piso de ruído: cai imediatamente, sobe devagar (PISO_SUBIDA_DB por janela)
+        candidato = float(np.percentile(energia, 10))
+        self._piso_db = candidato if self._piso_db is None else min(self._piso_db + PISO_SUBIDA_DB, candidato)
+        limiar = max(self._piso_db + 10.0, -55.0)
+        voz = energia > limiar
+
+        self._estatisticas_voz(energia[voz])
+        picos = self._picos(energia, voz, limiar)
+        self._segmentos(energia, voz, picos)
+        self.quadros += n
+
+    def _estatisticas_voz(self, e: np.ndarray) -> None:
+        # Welford em lote (combinação de médias/variâncias parciais)
+        if not len(e):
+            return
+        n_b, media_b = len(e), float(e.mean())
+        m2_b = float(((e - media_b) ** 2).sum())
+        n = self._n + n_b
+        delta = media_b - self._media
+        self._media += delta * n_b / n
+        self._m2 += m2_b + delta * delta * self._n * n_b / n
+        self._n = n
+
+    def _picos(self, energia: np.ndarray, voz: np.ndarray, limiar: float) -> np.ndarray:
+        """Índices (relativos à janela) de núcleos silábicos.
+
+        O último quadro da janela anterior entra como vizinho esquerdo do
+        primeiro; o último quadro desta janela fica sem avaliar (no máximo um
+        quadro de 20 ms a cada 2 s, irrelevante para a taxa).
+        """
+        ext = np.concatenate((self._cauda, energia))
+        off = len(self._cauda)
+        self._cauda = energia[-1:].copy()
+        if len(ext) < 3:
+            return np.zeros(0, dtype=np.int64)
+        meio = ext[1:-1]
+        cand = np.flatnonzero((meio > ext[:-2]) & (meio >= ext[2:]) & (meio > limiar + 6.0)) + 1 - off
+        cand = cand[cand >= 0]
+        cand = cand[voz[cand]]
+        aceitos = []
+        for i in cand:
+            absoluto = self.quadros + int(i)
+            if absoluto - self._ultimo_pico >= PICO_DIST_Q:
+                aceitos.append(int(i))
+                self._ultimo_pico = absoluto
+        return np.asarray(aceitos, dtype=np.int64)
+
+    def _segmentos(self, energia: np.ndarray, voz: np.ndarray, picos: np.ndarray) -> None:
+        # Runs de voz/silêncio da janela (vetorizado); o laço é por trecho, não por quadro
+        fronteiras = np.flatnonzero(np.diff(voz.astype(np.int8))) + 1
+        inicios = np.concatenate(([0], fronteiras))
+        fins = np.concatenate((fronteiras, [len(voz)]))
+        for ini, fim in zip(inicios, fins):
+            falando = bool(voz[ini])
+            if falando != self._falando:
+                self._fechar_trecho()
+                self._falando = falando
+            tam = int(fim - ini)
+            self._run += tam
+            if falando:
+                e = energia[ini:fim]
+                self._seg_n += tam
+                self._seg_soma += float(e.sum())
+                self._seg_soma2 += float(np.dot(e, e))
+                self._seg_picos += int(np.count_nonzero((picos >= ini) & (picos < fim)))
+
+    def _fechar_trecho(self) -> None:
+        if self._run == 0:
+            return
+        if self._falando:
+            self.voz_q += self._run
+            self.silabas += self._seg_picos
+            media = self._seg_soma / self._seg_n
+            desvio = math.sqrt(max(self._seg_soma2 / self._seg_n - media * media, 0.0))
+            if self._run >= HESITACAO_MIN_Q and self._seg_picos <= 1 and desvio < HESITACAO_DESVIO_DB:
+                self.hesitacoes += 1
+                self.hesitacao_q += self._run
+        elif self.voz_q and self._run >= _PAUSA_MIN_Q:
+            # Silêncio só conta como pausa depois de já ter havido fala
+            self.pausas += 1
+            self.pausa_total_q += self._run
+            self.pausa_max_q = max(self.pausa_max_q, self._run)
+            self.pausas_longas += self._run >= _PAUSA_LONGA_Q
+        self._run = 0
+        self._seg_picos = self._seg_n = 0
+        self._seg_soma = self._seg_soma2 = 0.0
+
+    # ---------- resultado ----------
+    def finalizar(self) -> dict:
+        # Janela incompleta do fim da chamada (o resto < 1 quadro é descartado)
+        if len(self._janela_e):
+            self._janela(self._janela_e)
+            self._janela_e = self._janela_e[:0]
+        # Silêncio final não é pausa (não há fala depois dele)
+        if self._falando:
+            self._fechar_trecho()
+        self._run = 0
+        fala_s = self.voz_q * QUADRO_S
+        spm = self.silabas / (fala_s / 60) if fala_s else 0.0
+        resumo = {
+            "duracao_s": round(self.quadros * QUADRO_S, 1),
+            "fala_s": round(fala_s, 1),
+            "silabas_por_minuto": round(spm, 1),
+            "palavras_por_minuto": round(spm / SILABAS_POR_PALAVRA, 1),
+            "pausas": {
+                "total": self.pausas,
+                "media_s": round(self.pausa_total_q * QUADRO_S / self.pausas, 2) if self.pausas else 0.0,
+                "max_s": round(self.pausa_max_q * QUADRO_S, 2),
+                "longas": int(self.pausas_longas),
+            },
+            "hesitacoes": self.hesitacoes,
+            "hesitacao_ratio": round(self.hesitacao_q / self.voz_q, 3) if self.voz_q else 0.0,
+            "variabilidade_energia_db": round(math.sqrt(self._m2 / self._n), 2) if self._n > 1 else 0.0,
+        }
+        resumo.update(avaliar(resumo))
+        return resumo
+
+
+def avaliar(r: dict) -> dict:
+    """Nota de 0 a 10 e itens para os cards de Feedback."""
+    fortes, melhorar = [], []
+    nota = 10.0
+    if r["fala_s"] < 10:
+        return {"nota": None, "pontos_fortes": [], "melhorias": ["Fale um pouco mais para gerarmos métricas confiáveis."]}
+    ppm = r["palavras_por_minuto"]
+    if ppm > 170:
+        melhorar.append("Ritmo acelerado: desacelere e respire entre as ideias.")
+        nota -= 1.5
+    elif ppm < 90:
+        melhorar.append("Ritmo lento: tente respostas mais diretas.")
+        nota -= 1.0
+    else:
+        fortes.append("Ritmo de fala confortável.")
+    if r["pausas"]["longas"] > 3:
+        melhorar.append("Pausas longas frequentes: prepare exemplos para as perguntas comuns.")
+        nota -= 1.5
+    elif r["pausas"]["total"]:
+        fortes.append("Pausas bem distribuídas.")
+    if r["hesitacao_ratio"] > 0.08:
+        melhorar.append("Muitas hesitações (\"éé\", \"hmm\"): troque por uma pausa breve.")
+        nota -= 1.5
+    else:
+        fortes.append("Poucas hesitações.")
+    if r["variabilidade_energia_db"] < 4:
+        melhorar.append("Entonação monótona: varie o volume para destacar pontos importantes.")
+        nota -= 1.0
+    else:
+        fortes.append("Boa variação de entonação.")
+    return {"nota": round(max(nota, 0.0), 1), "pontos_fortes": fortes, "melhorias": melhorar}
@@ -1,45 +1,51 @@
+# Primeiro import: marca o t0 do perfil de startup (GET /startup)
+import startup
+
+import asyncio
 import os
 import json
-from typing import Optional
-
-import httpx
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 import logging
 import time
 import uuid
-from pydantic import BaseModel
+from contextlib import asynccontextmanager
 
+with startup.phase("import.web"):
+    import httpx
+    from dotenv import load_dotenv
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import HTMLResponse, JSONResponse, Response
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.templating import Jinja2Templates
+    from pydantic import BaseModel, Field
 
-def read_secret(path: str) -> Optional[str]:
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            value = f.read().strip()
-            return value or None
-    except FileNotFoundError:
-        return None
-    except Exception:
-        # Do not leak details
-        return None
+# Carrega o .env uma única vez, antes de qualquer leitura de configuração
+# (tracing e log_config leem TRACE_FILE/TRACE_BUFFER/LOG_TEXT_MAX no import)
+load_dotenv()
+
+import openai_client
+import tracing
+from realtime_sessions import session_cache
+from log_config import log_event, redact, setup_logging, shutdown_logging, stats as log_stats
 
 
 def get_api_key() -> str:
-    # Prefer Swarm secret if available
-    secret = read_secret("/run/secrets/openai_api_key")
-    if secret:
-        return secret
-    env_key = os.getenv("OPENAI_API_KEY")
-    if env_key:
-        return env_key
+    key = openai_client.resolve_api_key()
+    if key:
+        return key
     raise HTTPException(status_code=500, detail={"error": "OPENAI_API_KEY not configured"})
 
 
 MODEL = os.getenv("MODEL", "gpt-realtime-2025-08-28")
 VOICE = os.getenv("VOICE", "marin")
 SILENCE_MS = int(os.getenv("SILENCE_MS", "600"))
+# Servidores ICE entregues ao navegador (JSON no formato RTCIceServer[]). Vazio por
+# padrão: o endpoint Realtime é público e candidatos host bastam na maioria das redes.
+ICE_SERVERS = json.loads(os.getenv("ICE_SERVERS", "[]"))
+ICE_MAX_WAIT_MS = int(os.getenv("ICE_MAX_WAIT_MS", "800"))
+# Transcrição da fala do usuário: alimenta o roteador local de comandos (/comandos);
+# vazio desativa (sem transcrição, todo pedido vai direto ao modelo)
+TRANSCRIBE_MODEL = os.getenv("TRANSCRIBE_MODEL", "gpt-4o-mini-transcribe")
 
 # Persona instructions (PT-BR), acessível para pessoas cegas.
 INSTRUCTIONS = os.getenv(
@@ -53,10 +59,101 @@ INSTRUCTIONS = os.getenv(
 
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+setup_logging(LOG_LEVEL)
 logger = logging.getLogger("farol-backend")
 
-app = FastAPI(title="Farol Realtime Backend", version="0.1.0")
+with startup.phase("import.routers"):
+    from routers.descrever_site import router as descrever_site_router
+    from routers.screenshot import router as screenshot_router, browser_pool, SCREENSHOT_DIR
+    from routers.fala import router as fala_router, AUDIO_DIR
+    from routers.vagas import router as vagas_router, carregar_catalogo
+    from routers.match import router as match_router
+    from routers.curriculo import router as curriculo_router, importacoes, CURRICULO_DIR
+    from routers.biblioteca import router as biblioteca_router
+    from routers.analise import router as analise_router, ANALISE_DIR
+    from routers.comandos import router as comandos_router
+    from biblioteca_audio import biblioteca_audio
+    from job_index import job_index
+    from matching import job_matrix
+
+
+async def _warm_browser():
+    # Aquece o Chromium em segundo plano: o app já aceita tráfego enquanto isso
+    try:
+        with startup.phase("warmup.browser"):
+            await browser_pool.get()
+    except Exception:
+        logger.exception("startup.browser_warmup_failed")
+
+
+async def _sync_embeddings():
+    try:
+        with startup.phase("warmup.embeddings"):
+            await asyncio.to_thread(job_matrix.sync)
+    except Exception:
+        logger.exception("startup.embeddings_sync_failed")
+
+
+# Pré-renderiza narrações ausentes no startup (fora do event loop); 0 = só o CLI do deploy
+AUDIO_LIB_AUTORENDER = os.getenv("AUDIO_LIB_AUTORENDER", "1") == "1"
+
+
+async def _render_audio_library():
+    try:
+        with startup.phase("warmup.audio_library"):
+            rendered = await asyncio.to_thread(biblioteca_audio.renderizar)
+        log_event(logger, "startup.audio_library_rendered", rendered=rendered)
+    except Exception:
+        logger.exception("startup.audio_library_render_failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tracing.start_exporter()
+    with startup.phase("startup.dirs"):
+        AUDIO_DIR.mkdir(exist_ok=True)
+        SCREENSHOT_DIR.mkdir(exist_ok=True)
+        CURRICULO_DIR.mkdir(exist_ok=True)
+        # Currículos de uploads interrompidos por um reinício (a extração nunca vai rodar)
+        for resto in CURRICULO_DIR.glob("upload-*"):
+            resto.unlink(missing_ok=True)
+        ANALISE_DIR.mkdir(exist_ok=True)
+    with startup.phase("startup.vagas"):
+        carregar_catalogo()
+    with startup.phase("startup.embeddings_load"):
+        job_matrix.load()
+    with startup.phase("startup.audio_library"):
+        biblioteca_audio.carregar()
+    faltantes = biblioteca_audio.faltantes()
+    if faltantes:
+        log_event(logger, "startup.audio_library_incomplete", logging.WARNING, missing=len(faltantes), ids=faltantes[:10])
+    background = []
+    if faltantes and AUDIO_LIB_AUTORENDER and openai_client.is_configured():
+        background.append(asyncio.create_task(_render_audio_library()))
+    # Só vagas com conteúdo novo são embedadas; roda fora do event loop
+    embeddings = asyncio.create_task(_sync_embeddings())
+    warmup = asyncio.create_task(_warm_browser())
+    startup.mark_started()
+    log_event(logger, "startup.serving", **startup.report())
+    yield
+    warmup.cancel()
+    embeddings.cancel()
+    for task in background:
+        task.cancel()
+    await browser_pool.close()
+    await importacoes.close()
+    tracing.stop_exporter()
+    shutdown_logging()
+
+
+startup.register_check("browser", lambda: browser_pool.warm)
+startup.register_check("upstream", openai_client.is_configured)
+startup.register_check("storage", lambda: all(d.is_dir() for d in (AUDIO_DIR, SCREENSHOT_DIR, CURRICULO_DIR, ANALISE_DIR)))
+startup.register_check("vagas", lambda: len(job_index) > 0)
+startup.register_check("embeddings", lambda: job_matrix.ready)
+startup.register_check("audio_library", lambda: biblioteca_audio.completa)
+
+app = FastAPI(title="Farol Realtime Backend", version="0.1.0", lifespan=lifespan)
 
 # CORS: permitir origens do Streamlit (para demo: *)
 app.add_middleware(
@@ -67,14 +164,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # Um trace por requisição; o id vem do cliente (X-Request-ID) quando existir
+    trace, token = tracing.begin(
+        f"{request.method} {request.url.path}",
+        request_id=request.headers.get("x-request-id", "")[:64] or None,
+        client_id=request.headers.get("x-client-id") or request.query_params.get("client_id"),
+    )
+    try:
+        response = await call_next(request)
+    finally:
+        tracing.finish(trace, token)
+    response.headers["X-Request-ID"] = trace.request_id
+    response.headers["Server-Timing"] = trace.server_timing()
+    return response
 
-from routers.descrever_site import router as descrever_site_router
-from routers.screenshot import router as screenshot_router
-from routers.fala import router as fala_router
 
 app.include_router(descrever_site_router)
 app.include_router(screenshot_router)
 app.include_router(fala_router)
+app.include_router(vagas_router)
+app.include_router(match_router)
+app.include_router(curriculo_router)
+app.include_router(biblioteca_router)
+app.include_router(analise_router)
+app.include_router(comandos_router)
 
 
 
@@ -86,19 +201,46 @@ templates = Jinja2Templates(directory="templates")
 
 @app.get("/health")
 async def health():
+    # Liveness: o processo responde. Não depende de subsistemas externos.
     logger.debug("Health check")
     return {"status": "ok"}
 
 
+@app.get("/ready")
+async def ready():
+    # Readiness: navegador aquecido, upstream configurado e caches carregados
+    state = startup.readiness()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+
+@app.get("/startup")
+async def startup_report():
+    return startup.report()
+
+
+def _valid_client_id(value: str | None) -> str | None:
+    if value and len(value) <= 64 and all(c.isalnum() or c == "-" for c in value):
+        return value
+    return None
+
+
 @app.post("/session")
-async def create_session():
+async def create_session(request: Request, response: Response):
+    client_id = _valid_client_id(request.headers.get("x-client-id"))
+    # Token reaproveitado recusado pela OpenAI: o navegador pede `X-Session-Fresh` e a entrada sai do cache
+    if request.headers.get("x-session-fresh") == "1":
+        session_cache.discard(client_id)
+    # Recarga do iframe com o mesmo client_id: reaproveita a sessão ainda válida
+    cached = session_cache.get(client_id)
+    if cached is not None:
+        log_event(logger, "session.request.resumed", client_id=client_id)
+        response.headers["X-Session-Resumed"] = "1"
+        return cached
+
     api_key = get_api_key()
     started = time.time()
-    rid = str(uuid.uuid4())
-    logger.info(
-        "session.request start %s",
-        json.dumps({"rid": rid, "model": MODEL, "voice": VOICE, "silence_ms": SILENCE_MS}, ensure_ascii=False),
-    )
+    rid = tracing.current_request_id() or str(uuid.uuid4())
+    log_event(logger, "session.request.start", rid=rid, model=MODEL, voice=VOICE, silence_ms=SILENCE_MS)
 
     payload = {
         "model": MODEL,
@@ -110,6 +252,8 @@ async def create_session():
             "silence_duration_ms": SILENCE_MS,
         },
     }
+    if TRANSCRIBE_MODEL:
+        payload["input_audio_transcription"] = {"model": TRANSCRIBE_MODEL, "language": "pt"}
 
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -120,7 +264,8 @@ async def create_session():
     url = "https://api.openai.com/v1/realtime/sessions"
     try:
         async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.post(url, headers=headers, json=payload)
+            with tracing.span("session.upstream"):
+                resp = await client.post(url, headers=headers, json=payload)
             # If OpenAI returns an error, surface the body when possible
             if resp.status_code >= 400:
                 detail: object
@@ -128,24 +273,20 @@ async def create_session():
                     detail = resp.json()
                 except Exception:
                     detail = {"status": resp.status_code, "message": resp.text[:500]}
-                logger.warning(
-                    "session.request error %s",
-                    json.dumps({"rid": rid, "status": resp.status_code, "detail": detail}, ensure_ascii=False),
-                )
+                log_event(logger, "session.request.error", logging.WARNING, rid=rid, status=resp.status_code, detail=detail)
                 raise HTTPException(status_code=resp.status_code, detail=detail)
             data = resp.json()
             elapsed_ms = int((time.time() - started) * 1000)
-            # Do not log secrets
-            safe = {
-                k: v
-                for k, v in data.items()
-                if k not in {"client_secret", "server_secret", "key", "token"}
-            }
-            session_id = safe.get("id") if isinstance(safe, dict) else None
-            logger.info(
-                "session.request ok %s",
-                json.dumps({"rid": rid, "elapsed_ms": elapsed_ms, "session_id": session_id, "meta": safe}, ensure_ascii=False),
+            # Do not log secrets (nem as instruções completas): só metadados curtos
+            log_event(
+                logger,
+                "session.request.ok",
+                rid=rid,
+                elapsed_ms=elapsed_ms,
+                session_id=data.get("id"),
+                expires_at=data.get("expires_at"),
             )
+            session_cache.put(client_id, data)
             # Return the session JSON as-is
             return data
     except HTTPException:
@@ -158,13 +299,12 @@ async def create_session():
         raise HTTPException(status_code=500, detail={"error": "Unexpected server error"})
 
 @app.get("/webrtc", response_class=HTMLResponse)
-async def webrtc_page(request: Request):
-    # Expose model for the JS via template context
-    client_id = str(uuid.uuid4())
-    logger.info(
-        "webrtc.page %s",
-        json.dumps({"client_id": client_id, "client": request.client.host if request.client else None}, ensure_ascii=False),
-    )
+async def webrtc_page(request: Request, client_id: str | None = None):
+    # Expose model for the JS via template context. O Streamlit passa um
+    # client_id estável (?client_id=) para que recargas retomem a mesma sessão.
+    client_id = _valid_client_id(client_id) or str(uuid.uuid4())
+    tracing.annotate(client_id=client_id)
+    log_event(logger, "webrtc.page", client_id=client_id, client=request.client.host if request.client else None)
     return templates.TemplateResponse(
         "webrtc.html",
         {
@@ -173,31 +313,62 @@ async def webrtc_page(request: Request):
             "voice": VOICE,
             "silence_ms": SILENCE_MS,
             "client_id": client_id,
+            "ice_servers": ICE_SERVERS,
+            "ice_max_wait_ms": ICE_MAX_WAIT_MS,
         },
     )
 
 
+# Tipos enviados pelo webrtc.js; o resto vira `client.other` (o nome do evento
+# indexa os contadores do /logs/stats e não pode crescer sem limite)
+CLIENT_LOG_TYPES = frozenset({
+    "page_load", "session_ok", "session_error", "sdp_error", "error", "pc", "ice", "media",
+    "dc", "dc_event", "dc_raw", "transcript_user", "transcript_assistant",
+    "connect", "reconnect", "call_timing", "analytics", "voice_command",
+})
+
+
 class LogEvent(BaseModel):
-    client_id: str
-    type: str
+    client_id: str = Field(..., max_length=64)
+    type: str = Field(..., max_length=32)
     message: str | None = None
     data: dict | None = None
 
 
 @app.post("/logs")
 async def collect_logs(event: LogEvent, request: Request):
-    # Centralize client-side debug into server logs (no secrets)
-    logger.info(
-        "client.log %s",
-        json.dumps(
-            {
-                "client_id": event.client_id,
-                "evt_type": event.type,
-                "evt_message": event.message,
-                "evt_data": event.data,
-                "remote": request.client.host if request.client else None,
-            },
-            ensure_ascii=False,
-        ),
+    tracing.annotate(client_id=event.client_id)
+    # Centralize client-side debug into server logs (no secrets); eventos
+    # frequentes (transcrições, dc_event) são amostrados em log_config.SAMPLE_RATES
+    known = event.type in CLIENT_LOG_TYPES
+    log_event(
+        logger,
+        f"client.{event.type}" if known else "client.other",
+        **({} if known else {"evt_type": redact(event.type)}),
+        client_id=event.client_id,
+        evt_message=redact(event.message),
+        evt_data={k: redact(v) if isinstance(v, str) else v for k, v in (event.data or {}).items()},
+        remote=request.client.host if request.client else None,
     )
+    data = event.data or {}
+    if event.type == "reconnect" and isinstance(data.get("ms"), (int, float)):
+        session_cache.record_reconnect(data["ms"])
+    elif event.type == "call_timing" and isinstance(data.get("phases"), dict):
+        session_cache.record_call_timing(data["phases"])
     return {"ok": True}
+
+
+@app.get("/session/stats")
+async def session_stats():
+    return session_cache.stats()
+
+
+@app.get("/traces/slowest")
+async def traces_slowest(limit: int = 10, name: str | None = None):
+    # Ex.: /traces/slowest?name=POST%20/descrever/imagem
+    return {"traces": tracing.slowest(limit=min(limit, 100), name=name), "amostragem": tracing.amostragem()}
+
+
+@app.get("/logs/stats")
+async def logs_stats():
+    return log_stats()
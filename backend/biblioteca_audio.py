@@ -0,0 +1,102 @@
+"""Biblioteca de áudio pré-renderizada para textos estáticos da interface.
+
+- `conteudo/narracoes.json` descreve cada texto narrável (Boas-vindas, Home,
+  Cadastro, Biblioteca) com um `id` estável.
+- A versão de cada entrada é o hash do texto falado + modelo/voz/instrução
+  (`routers.fala.versao_fala`); o arquivo fica em `<id>.<versao>.mp3` e nunca
+  muda depois de gravado, então pode ser servido com cache imutável.
+- `renderizar()` sintetiza só entradas ausentes ou alteradas, pelo mesmo
+  caminho de TTS do `/fala/gerar-audio`. Nenhum TTS acontece durante requisições.
+
+Pré-renderização manual (ex.: no deploy): `python biblioteca_audio.py --render`.
+"""
+
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from log_config import log_event
+from routers.fala import AUDIO_DIR, sintetizar, versao_fala
+
+logger = logging.getLogger(__name__)
+
+AUDIO_LIB_MANIFEST = Path(os.getenv("AUDIO_LIB_MANIFEST", "conteudo/narracoes.json"))
+# Dentro de AUDIO_DIR por padrão: reaproveita o volume já montado no compose
+AUDIO_LIB_DIR = Path(os.getenv("AUDIO_LIB_DIR", str(AUDIO_DIR / "biblioteca")))
+AUDIO_LIB_WORKERS = int(os.getenv("AUDIO_LIB_WORKERS", "4"))
+
+
+class BibliotecaAudio:
+    def __init__(self, manifesto: Path, directory: Path):
+        self.manifesto = manifesto
+        self.directory = directory
+        self.entradas: dict[str, dict] = {}
+
+    def carregar(self) -> int:
+        with open(self.manifesto, "r", encoding="utf-8") as f:
+            itens = json.load(f)
+        self.entradas = {
+            item["id"]: {"id": item["id"], "titulo": item["titulo"], "texto": item["texto"], "versao": versao_fala(item["texto"])}
+            for item in itens
+        }
+        return len(self.entradas)
+
+    def caminho(self, entrada_id: str, versao: str) -> Path:
+        return self.directory / f"{entrada_id}.{versao}.mp3"
+
+    def faltantes(self) -> list[str]:
+        return [e["id"] for e in self.entradas.values() if not self.caminho(e["id"], e["versao"]).exists()]
+
+    @property
+    def completa(self) -> bool:
+        return bool(self.entradas) and not self.faltantes()
+
+    def _renderizar_uma(self, entrada_id: str) -> None:
+        entrada = self.entradas[entrada_id]
+        destino = self.caminho(entrada_id, entrada["versao"])
+        tmp = destino.with_suffix(".tmp")
+        sintetizar(entrada["texto"], tmp)
+        # Renomeação atômica: um arquivo versionado nunca é visto pela metade
+        os.replace(tmp, destino)
+        log_event(logger, "biblioteca_audio.render", id=entrada_id, versao=entrada["versao"])
+
+    def renderizar(self, workers: int = AUDIO_LIB_WORKERS) -> int:
+        """Sintetiza entradas ausentes/alteradas em paralelo (chamadas de rede)."""
+        faltantes = self.faltantes()
+        if not faltantes:
+            return 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(self._renderizar_uma, faltantes))
+        return len(faltantes)
+
+    def listar(self) -> list[dict]:
+        return [
+            {
+                "id": e["id"],
+                "titulo": e["titulo"],
+                "versao": e["versao"],
+                "url": f"/biblioteca/audio/{e['id']}/{e['versao']}.mp3",
+                "disponivel": self.caminho(e["id"], e["versao"]).exists(),
+            }
+            for e in self.entradas.values()
+        ]
+
+
+biblioteca_audio = BibliotecaAudio(AUDIO_LIB_MANIFEST, AUDIO_LIB_DIR)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    from log_config import setup_logging, shutdown_logging
+
+    load_dotenv()
+    setup_logging("INFO")
+    biblioteca_audio.carregar()
+    try:
+        print(f"renderizadas: {biblioteca_audio.renderizar()} de {len(biblioteca_audio.entradas)} entradas")
+    finally:
+        shutdown_logging()
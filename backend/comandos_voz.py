@@ -0,0 +1,248 @@
+"""Roteador local de comandos de voz (navegação, busca de vagas, acessibilidade).
+
+Comandos de menu não precisam do modelo: uma gramática fixa, compilada em
+expressões regulares sobre o texto normalizado, decide a intenção, e os
+valores de filtro são extraídos por similaridade (tolerante a erros do
+reconhecimento de fala: "remota", "sao paulo", "junio"). Só o que não casa
+com a gramática vai para o modelo (`intencao="conversa"`).
+
+Vocabulário:
+- páginas: `PAGINAS` (mesmos nomes de `PAGES` em frontend_streamlit/streamlit_app.py);
+- filtros: valores de `job_index` (área, nível, modelo, local, acessibilidade);
+- acessibilidade da interface: zoom, alto contraste, tema claro/escuro, animações.
+"""
+
+import re
+import time
+from collections import Counter, deque
+from difflib import SequenceMatcher
+
+from job_index import ACESSIBILIDADE, SINGLE_FACETS, normalize
+
+# Nome da página (igual ao PAGES do Streamlit) -> como as pessoas a chamam
+PAGINAS = {
+    "Boas-vindas": ["boas vindas", "bem vindo", "inicio", "apresentacao"],
+    "Home": ["home", "painel", "pagina inicial", "meu painel"],
+    "Cadastro por Voz": ["cadastro", "cadastro por voz", "meu perfil", "perfil", "curriculo"],
+    "Vagas": ["vagas", "vaga", "empregos", "oportunidades", "busca de vagas"],
+    "Hub de Desenvolvimento": ["hub", "hub de desenvolvimento", "desenvolvimento", "cursos", "trilhas"],
+    "Portfólio de Acessibilidade": ["portfolio", "portfolio de acessibilidade"],
+    "Comunidade": ["comunidade", "forum"],
+    "Biblioteca": ["biblioteca", "direitos", "leis", "legislacao"],
+    "Entrevista (Realtime)": ["entrevista", "simulador", "simulador de entrevista"],
+    "Simulação em Andamento": ["simulacao", "simulacao em andamento"],
+    "Feedback": ["feedback", "meu feedback", "resultado", "desempenho"],
+}
+
+# Variações faladas dos valores de filtro (além do próprio valor normalizado)
+_VARIACOES = {
+    "Remoto": ["remota", "home office", "a distancia"],
+    "Híbrido": ["hibrida"],
+    "Presencial": ["no escritorio"],
+    "Júnior": ["junior", "junio"],
+    "Sênior": ["senior"],
+    "Desenvolvimento": ["programacao", "desenvolvedor", "desenvolvedora", "dev"],
+    "QA": ["qualidade", "testes", "teste"],
+    "Dados": ["ciencia de dados"],
+    "São Paulo": ["sampa"],
+    "Brasília": ["brasilia", "df"],
+    "Leitor de tela": ["leitores de tela"],
+    "Subtítulos automáticos": ["legendas", "legenda automatica", "legendas automaticas"],
+}
+
+_CHAMADO = re.compile(r"^(?:(?:ei|oi|ola)\s+)?farol\b")
+_PREFIXOS = re.compile(r"^(?:(?:ei|oi|ola)\s+)?(?:farol\s+)?(?:(?:por favor|pode|poderia|quero|queria|gostaria de|eu quero|me)\s+)*")
+_BUSCA = re.compile(
+    r"^(?:buscar|busca|busque|procurar|procura|procure|pesquisar|pesquisa|pesquise|encontrar|encontre|mostrar|mostre|mostra|listar|liste|ver)"
+    r"\s+(?:as\s+|por\s+|umas?\s+)?(?:vagas?|empregos?|oportunidades?|trabalhos?)\b(?P<resto>.*)$"
+)
+_NAVEGAR = re.compile(
+    r"^(?:abrir|abre|abra|ir|va|vai|vamos|mostrar|mostre|mostra|acessar|acessa|acesse|entrar|entra|entre|voltar|volta|volte|navegar|ver)\b"
+    r"(?:\s+(?:para|pra|pro|ao|a|o|na|no|em|as|os|da|do|de|minha|meu|pagina|tela|aba|secao))*\s+(?P<alvo>.+)$"
+)
+_ZOOM = re.compile(
+    r"\b(?P<mais>aumentar|aumenta|aumente|ampliar|amplie|maior)\b|\b(?P<menos>diminuir|diminua|diminui|reduzir|reduza|menor)\b"
+    r"|\b(?P<reset>normal|restaurar|restaure|resetar|padrao)\b"
+)
+_ZOOM_ALVO = re.compile(r"\b(?:fonte|letras?|texto|zoom|tamanho)\b")
+# Sem "para"/"sem" soltos: são preposições comuns ("ativar alto contraste para mim")
+_DESLIGAR = re.compile(r"\b(?:desativar|desativa|desative|desligar|desliga|desligue|tirar|tira|tire|parar|pare)\b|^sem\b")
+_LIGAR = re.compile(r"\b(?:ativar|ativa|ative|ligar|liga|ligue|colocar|coloca|coloque|usar|usa|use|habilitar|habilita|habilite)\b")
+_REDUZIR = re.compile(r"\b(?:reduzir|reduza|diminuir|diminua|menos)\b")
+_CONTRASTE = re.compile(r"\balto contraste\b|\bcontraste\b")
+_TEMA = re.compile(r"\b(?:modo|tema|fundo)\s+(?P<tema>claro|escuro)\b")
+_MOVIMENTO = re.compile(r"\b(?:animac\w*|movimentos?)\b")
+_TOKEN = re.compile(r"[a-z0-9]+")
+_RUIDO = {"de", "da", "do", "das", "dos", "em", "no", "na", "nos", "nas", "para", "pra", "com", "que", "e", "a", "o", "as", "os", "um", "uma", "nivel", "area", "modelo", "cidade", "vaga", "vagas"}
+
+FUZZY_CORTE = 0.82
+
+
+def _limpar(texto: str) -> str:
+    return " ".join(_TOKEN.findall(normalize(texto)))
+
+
+class Vocabulario:
+    """Frase normalizada -> (faceta, valor canônico), agrupada por nº de palavras."""
+
+    def __init__(self):
+        self.por_tamanho: dict[int, dict[str, tuple[str, str]]] = {}
+        facetas = {**SINGLE_FACETS, "acessibilidade": ACESSIBILIDADE}
+        for faceta, valores in facetas.items():
+            for valor in valores:
+                for frase in [valor, *_VARIACOES.get(valor, [])]:
+                    chave = _limpar(frase)
+                    self.por_tamanho.setdefault(len(chave.split()), {})[chave] = (faceta, valor)
+        self.paginas: dict[str, str] = {_limpar(a): nome for nome, aliases in PAGINAS.items() for a in [nome, *aliases]}
+
+    @staticmethod
+    def _melhor(frase: str, candidatos) -> tuple[str | None, float]:
+        if frase in candidatos:
+            return frase, 1.0
+        melhor, nota = None, 0.0
+        m = SequenceMatcher(b=frase, autojunk=False)
+        for cand in candidatos:
+            m.set_seq1(cand)
+            if m.real_quick_ratio() < FUZZY_CORTE or m.quick_ratio() < FUZZY_CORTE:
+                continue
+            r = m.ratio()
+            if r > nota:
+                melhor, nota = cand, r
+        return (melhor, nota) if nota >= FUZZY_CORTE else (None, 0.0)
+
+    def pagina(self, alvo: str) -> str | None:
+        chave, _ = self._melhor(alvo, self.paginas)
+        return self.paginas[chave] if chave else None
+
+    def slots(self, tokens: list[str]) -> tuple[dict, list[str]]:
+        """Extrai filtros (n-gramas mais longos primeiro); devolve também os tokens que sobraram."""
+        filtros: dict = {}
+        usados = [False] * len(tokens)
+        for n in sorted(self.por_tamanho, reverse=True):
+            vocab = self.por_tamanho[n]
+            for i in range(len(tokens) - n + 1):
+                if any(usados[i:i + n]):
+                    continue
+                chave, _ = self._melhor(" ".join(tokens[i:i + n]), vocab)
+                if chave is None:
+                    continue
+                faceta, valor = vocab[chave]
+                if faceta == "acessibilidade":
+                    filtros.setdefault(faceta, [])
+                    if valor not in filtros[faceta]:
+                        filtros[faceta].append(valor)
+                elif faceta in filtros:
+                    continue
+                else:
+                    filtros[faceta] = valor
+                usados[i:i + n] = [True] * n
+        resto = [t for t, u in zip(tokens, usados) if not u and t not in _RUIDO]
+        return filtros, resto
+
+
+class RoteadorComandos:
+    def __init__(self):
+        self.vocab = Vocabulario()
+        self.total = 0
+        self.por_intencao: Counter = Counter()
+        self._ms: deque = deque(maxlen=1000)
+
+    def _acessibilidade(self, texto: str) -> dict | None:
+        tema = _TEMA.search(texto)
+        if tema:
+            return {"acao": "tema", "valor": "light" if tema.group("tema") == "claro" else "dark"}
+        # Verbo explícito de ligar vence; sem verbo nenhum, o pedido é para ligar
+        desligar = not _LIGAR.search(texto) and bool(_DESLIGAR.search(texto))
+        if _CONTRASTE.search(texto):
+            # "diminuir/menos contraste" também desliga o alto contraste
+            reduzir = not _LIGAR.search(texto) and bool(_REDUZIR.search(texto))
+            return {"acao": "alto_contraste", "valor": not (desligar or reduzir)}
+        if _MOVIMENTO.search(texto):
+            # "reduzir/desligar animações" liga o "Reduzir animações"; "ativar animações" desliga
+            reduzir = bool(_REDUZIR.search(texto)) or desligar
+            return {"acao": "reduzir_animacoes", "valor": reduzir}
+        if _ZOOM_ALVO.search(texto):
+            m = _ZOOM.search(texto)
+            if m:
+                return {"acao": "zoom", "valor": next(k for k in ("mais", "menos", "reset") if m.group(k))}
+        return None
+
+    def _interpretar(self, texto: str) -> dict:
+        normal = _limpar(texto)
+        chamado = bool(_CHAMADO.match(normal))
+        limpo = _PREFIXOS.sub("", normal)
+        if not limpo:
+            return {"intencao": "conversa"}
+
+        # Frases longas que citam "contraste"/"fonte" são conversa, não ajuste da interface
+        acess = self._acessibilidade(limpo) if len(limpo.split()) <= 6 else None
+        if acess:
+            return {"intencao": "acessibilidade", **acess}
+
+        busca = _BUSCA.match(limpo)
+        if busca:
+            filtros, resto = self.vocab.slots(busca.group("resto").split())
+            return {"intencao": "buscar_vagas", "pagina": "Vagas", "filtros": filtros, "q": " ".join(resto)}
+
+        nav = _NAVEGAR.match(limpo)
+        alvo = nav.group("alvo") if nav else limpo
+        # Sem verbo, só com a palavra de chamada ("Farol, biblioteca"): durante a entrevista
+        # uma resposta curta como "resultado" ou "perfil" é conversa, não navegação
+        pagina = self.vocab.pagina(alvo) if nav or (chamado and len(alvo.split()) <= 3) else None
+        if pagina:
+            return {"intencao": "navegar", "pagina": pagina}
+        return {"intencao": "conversa"}
+
+    def interpretar(self, texto: str) -> dict:
+        inicio = time.perf_counter()
+        resultado = self._interpretar(texto)
+        ms = (time.perf_counter() - inicio) * 1000
+        self.total += 1
+        self.por_intencao[resultado["intencao"]] += 1
+        self._ms.append(ms)
+        resultado["llm"] = resultado["intencao"] == "conversa"
+        resultado["ms"] = round(ms, 3)
+        return resultado
+
+    def stats(self) -> dict:
+        locais = self.total - self.por_intencao["conversa"]
+        return {
+            "total": self.total,
+            "locais": locais,
+            "fallback_llm": self.por_intencao["conversa"],
+            "hit_rate": round(locais / self.total, 3) if self.total else None,
+            "por_intencao": dict(self.por_intencao),
+            "latencia_ms": {"count": len(self._ms), **_latencias(self._ms)},
+        }
+
+
+def _latencias(valores) -> dict:
+    # Precisão de microssegundos: o roteador responde bem abaixo de 1 ms
+    amostras = sorted(valores)
+    if not amostras:
+        return {"p50": None, "p95": None}
+    return {p: round(amostras[min(len(amostras) - 1, int(q * len(amostras)))], 3) for p, q in (("p50", 0.5), ("p95", 0.95))}
+
+
+roteador = RoteadorComandos()
+
+
+if __name__ == "__main__":
+    import sys
+
+    exemplos = [
+        "Farol, buscar vagas de analista de marketing remoto em São Paulo",
+        "abrir hub",
+        "ativar alto contraste para mim",
+        "coloca o alto contraste por favor",
+        "desligar o alto contraste",
+        "sem alto contraste",
+        "ativar animações para mim",
+        "parar as animações",
+        "diminuir o contraste",
+        "resultado",
+        "Farol, biblioteca",
+    ]
+    for frase in sys.argv[1:] or exemplos:
+        print(frase, "->", roteador.interpretar(frase))
+    print(roteador.stats())
@@ -0,0 +1,86 @@
+"""Extração de texto e campos estruturados de currículos (PDF, DOCX, DOC).
+
+Roda dentro de um `ProcessPoolExecutor` (ver routers/curriculo.py): as
+funções aqui são puras, de nível de módulo e recebem/devolvem só tipos
+simples, para serem serializáveis entre processos.
+"""
+
+import re
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+MAX_EXPERIENCIA = 1500
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_SECOES_EXPERIENCIA = re.compile(r"^(experi[eê]ncias?( profissional| profissionais)?|resumo( profissional)?|perfil( profissional)?|sobre mim)\s*:?\s*$", re.I)
+_SECAO_QUALQUER = re.compile(r"^(forma[cç][aã]o|educa[cç][aã]o|idiomas|habilidades|compet[eê]ncias|cursos|certifica[cç][oõ]es|contato|refer[eê]ncias|projetos)\s*:?\s*$", re.I)
+_CARGO = re.compile(r"^(objetivo|cargo( desejado)?|cargo pretendido)\s*:?\s*(.*)$", re.I)
+_NOME = re.compile(r"^[A-Za-zÀ-ÖØ-öø-ÿ'.-]+(\s+[A-Za-zÀ-ÖØ-öø-ÿ'.-]+){1,5}$")
+
+
+def _texto_pdf(path: Path) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(path))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _texto_docx(path: Path) -> str:
+    with zipfile.ZipFile(path) as z:
+        root = ElementTree.fromstring(z.read("word/document.xml"))
+    linhas = []
+    for par in root.iter(f"{_W_NS}p"):
+        linhas.append("".join(t.text or "" for t in par.iter(f"{_W_NS}t")))
+    return "\n".join(linhas)
+
+
+def _texto_doc(path: Path) -> str:
+    # Word 97-2003: o texto fica em UTF-16LE dentro do binário; extração aproximada
+    data = path.read_bytes()
+    trechos = re.findall(rb"(?:[\x20-\x7e\xc0-\xff]\x00|\r\x00){4,}", data)
+    return "\n".join(t.decode("utf-16le", errors="ignore").replace("\r", "\n") for t in trechos)
+
+
+EXTRATORES = {".pdf": _texto_pdf, ".docx": _texto_docx, ".doc": _texto_doc}
+
+
+def extrair_campos(texto: str) -> dict:
+    """Heurística para `cad_nome`, `cad_cargo` e `cad_exp`."""
+    linhas = [l.strip() for l in texto.splitlines() if l.strip()]
+    nome = next((l for l in linhas[:5] if _NOME.match(l) and "@" not in l), "")
+
+    cargo = ""
+    for i, linha in enumerate(linhas):
+        m = _CARGO.match(linha)
+        if m:
+            cargo = m.group(3) or (linhas[i + 1] if i + 1 < len(linhas) else "")
+            break
+    if not cargo and nome:
+        # Sem seção explícita: linha logo abaixo do nome costuma ser o título profissional
+        seguinte = linhas[linhas.index(nome) + 1] if linhas.index(nome) + 1 < len(linhas) else ""
+        if seguinte and len(seguinte) <= 80 and "@" not in seguinte and not re.search(r"\d{4}", seguinte):
+            cargo = seguinte
+
+    experiencia: list[str] = []
+    dentro = False
+    for linha in linhas:
+        if _SECOES_EXPERIENCIA.match(linha):
+            dentro = True
+            continue
+        if dentro and _SECAO_QUALQUER.match(linha):
+            break
+        if dentro:
+            experiencia.append(linha)
+    exp = "\n".join(experiencia)[:MAX_EXPERIENCIA]
+    return {"cad_nome": nome, "cad_cargo": cargo.strip(), "cad_exp": exp}
+
+
+def processar(path: str) -> dict:
+    """Ponto de entrada do worker: texto + campos de um arquivo já salvo em disco."""
+    p = Path(path)
+    extrator = EXTRATORES.get(p.suffix.lower())
+    if extrator is None:
+        raise ValueError(f"Formato não suportado: {p.suffix}")
+    texto = extrator(p)
+    return {"caracteres": len(texto), "campos": extrair_campos(texto)}
@@ -0,0 +1,276 @@
+"""Catálogo de vagas em memória: índice invertido + facetas colunares.
+
+- Texto (título, descrição, empresa e valores de faceta) → índice invertido `token -> array de doc ids`
+  (ids crescentes, então cada posting list já nasce ordenada).
+- Facetas de valor único (área, nível, modelo, local) → colunas NumPy `int16`
+  com o código do valor; acessibilidade (multivalorada) → bitmask `uint8`.
+- Filtro = máscara booleana vetorizada sobre as colunas; texto = interseção
+  das posting lists, começando pela menor.
+- Ingestão é incremental: reindexar um `id` existente apenas marca o doc
+  antigo como morto (`alive`) e acrescenta o novo no fim.
+
+Benchmark: `python job_index.py --bench 100000`.
+"""
+
+import random
+import re
+import threading
+import time
+import unicodedata
+from array import array
+
+import numpy as np
+
+AREAS = ["Desenvolvimento", "QA", "Design", "Dados", "Marketing", "Produto", "Suporte", "Administrativo"]
+NIVEIS = ["Júnior", "Pleno", "Sênior"]
+MODELOS = ["Remoto", "Híbrido", "Presencial"]
+ACESSIBILIDADE = ["Leitor de tela", "Alto contraste", "Navegação por voz", "Subtítulos automáticos"]
+LOCAIS = ["São Paulo", "Rio de Janeiro", "Belo Horizonte", "Porto Alegre", "Recife", "Salvador", "Curitiba", "Brasília"]
+
+SINGLE_FACETS = {"area": AREAS, "nivel": NIVEIS, "modelo": MODELOS, "local": LOCAIS}
+
+_STOPWORDS = {
+    "a", "o", "as", "os", "de", "da", "do", "das", "dos", "e", "em", "no", "na", "nos", "nas",
+    "para", "por", "com", "um", "uma", "ou", "que", "vaga", "vagas",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas e sem acentos ("Sênior" -> "senior")."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for tok in _TOKEN_RE.findall(normalize(text)):
+        # Plural simples: "analistas" e "analista" caem no mesmo termo
+        if len(tok) > 3 and tok.endswith("s"):
+            tok = tok[:-1]
+        if tok not in _STOPWORDS:
+            tokens.append(tok)
+    return tokens
+
+
+def _searchable_text(job: dict) -> str:
+    # Local/modelo/área também entram no texto: "analista remoto em São Paulo" casa por termos
+    fields = ("titulo", "descricao", "empresa", "area", "nivel", "modelo", "local")
+    return " ".join(str(job.get(f) or "") for f in fields)
+
+
+class _Column:
+    """Coluna NumPy com crescimento amortizado (dobra a capacidade)."""
+
+    def __init__(self, dtype, fill=0):
+        self.data = np.full(1024, fill, dtype=dtype)
+        self.fill = fill
+
+    def ensure(self, size: int) -> None:
+        if size > len(self.data):
+            grown = np.full(max(size, 2 * len(self.data)), self.fill, dtype=self.data.dtype)
+            grown[: len(self.data)] = self.data
+            self.data = grown
+
+
+class JobIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs: list[dict] = []
+        self._by_id: dict[str, int] = {}
+        self._postings: dict[str, array] = {}
+        self._codes = {name: {normalize(v): i for i, v in enumerate(values)} for name, values in SINGLE_FACETS.items()}
+        self._access_bits = {normalize(v): 1 << i for i, v in enumerate(ACESSIBILIDADE)}
+        self._cols = {name: _Column(np.int16, -1) for name in SINGLE_FACETS}
+        self._access = _Column(np.uint8)
+        self._alive = _Column(np.bool_, False)
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    # ---------- ingestão ----------
+    def add(self, job: dict) -> int:
+        """Indexa (ou substitui, pelo `id`) uma vaga. Retorna o doc id interno."""
+        with self._lock:
+            old = self._by_id.get(job["id"])
+            if old is not None:
+                self._alive.data[old] = False
+            doc = len(self._docs)
+            self._docs.append(job)
+            self._by_id[job["id"]] = doc
+            for col in (*self._cols.values(), self._access, self._alive):
+                col.ensure(doc + 1)
+            for name, col in self._cols.items():
+                col.data[doc] = self._codes[name].get(normalize(job.get(name) or ""), -1)
+            mask = 0
+            for feature in job.get("acessibilidade") or ():
+                mask |= self._access_bits.get(normalize(feature), 0)
+            self._access.data[doc] = mask
+            for tok in set(tokenize(_searchable_text(job))):
+                self._postings.setdefault(tok, array("i")).append(doc)
+            self._alive.data[doc] = True
+            self.version += 1
+            return doc
+
+    def add_many(self, jobs) -> int:
+        count = 0
+        for job in jobs:
+            self.add(job)
+            count += 1
+        return count
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            doc = self._by_id.pop(job_id, None)
+            if doc is None:
+                return False
+            self._alive.data[doc] = False
+            self.version += 1
+            return True
+
+    def live_jobs(self) -> list[dict]:
+        with self._lock:
+            return [self._docs[d] for d in self._by_id.values()]
+
+    def docs_since(self, start: int) -> tuple[list[dict], np.ndarray]:
+        """Docs internos a partir de `start` (append-only) e a máscara atual de vivos."""
+        with self._lock:
+            n = len(self._docs)
+            return self._docs[start:n], self._alive.data[:n].copy()
+
+    def get(self, job_id: str) -> dict | None:
+        doc = self._by_id.get(job_id)
+        return self._docs[doc] if doc is not None else None
+
+    # ---------- consulta ----------
+    def _facet_mask(self, n: int, filters: dict) -> np.ndarray | None:
+        mask = None
+        for name, col in self._cols.items():
+            value = filters.get(name)
+            if not value:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            codes = [self._codes[name].get(normalize(v), -2) for v in values]
+            part = np.isin(col.data[:n], codes) if len(codes) > 1 else col.data[:n] == codes[0]
+            mask = part if mask is None else mask & part
+        features = filters.get("acessibilidade") or ()
+        if features:
+            bits = [self._access_bits.get(normalize(f), 0) for f in features]
+            if not all(bits):
+                # Recurso desconhecido: nenhuma vaga o atende (antes o filtro era ignorado)
+                return np.zeros(n, dtype=np.bool_)
+            wanted = 0
+            for bit in bits:
+                wanted |= bit
+            part = (self._access.data[:n] & wanted) == wanted
+            mask = part if mask is None else mask & part
+        return mask
+
+    def search(self, q: str = "", page: int = 1, page_size: int = 20, **filters) -> dict:
+        """Busca AND nos termos de `q` + filtros de faceta; mais recentes primeiro."""
+        # Sob o lock: `np.frombuffer` exporta o buffer das posting lists e um
+        # `append` concorrente não pode realocá-las enquanto a consulta roda
+        with self._lock:
+            return self._search(q, page, page_size, filters)
+
+    def _search(self, q: str, page: int, page_size: int, filters: dict) -> dict:
+        n = len(self._docs)
+        alive = self._alive.data[:n]
+        mask = self._facet_mask(n, filters)
+        mask = alive if mask is None else mask & alive
+
+        terms = tokenize(q) if q else []
+        if terms:
+            postings = [self._postings.get(t) for t in terms]
+            if any(p is None for p in postings):
+                ids = np.empty(0, dtype=np.int32)
+            else:
+                postings.sort(key=len)
+                ids = np.frombuffer(postings[0], dtype=np.int32)
+                for p in postings[1:]:
+                    ids = np.intersect1d(ids, np.frombuffer(p, dtype=np.int32), assume_unique=True)
+            ids = ids[mask[ids]]
+        else:
+            ids = np.flatnonzero(mask)
+
+        total = int(len(ids))
+        page = max(1, page)
+        start = total - page * page_size
+        stop = total - (page - 1) * page_size
+        window = ids[max(0, start):max(0, stop)][::-1]
+        return {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "items": [self._docs[int(d)] for d in window],
+        }
+
+
+# ---------- dados sintéticos (seed de demonstração e benchmark) ----------
+_CARGOS = {
+    "Desenvolvimento": ["Desenvolvedor(a) Front-end", "Desenvolvedor(a) Back-end", "Desenvolvedor(a) Acessibilidade", "Engenheiro(a) de Software"],
+    "QA": ["Analista de QA", "Engenheiro(a) de Testes", "Especialista em Testes de Acessibilidade"],
+    "Design": ["Designer UX", "Designer de Interação", "Pesquisador(a) UX"],
+    "Dados": ["Analista de Dados", "Cientista de Dados", "Engenheiro(a) de Dados"],
+    "Marketing": ["Analista de Marketing", "Analista de Marketing Digital", "Redator(a)"],
+    "Produto": ["Product Manager", "Product Owner", "Analista de Produto"],
+    "Suporte": ["Analista de Suporte", "Atendente de Suporte", "Técnico(a) de Suporte"],
+    "Administrativo": ["Assistente Administrativo", "Analista Financeiro", "Analista de RH"],
+}
+_REQUISITOS = [
+    "WAI-ARIA", "acessibilidade web", "testes automatizados", "React", "Python", "SQL", "Figma",
+    "comunicação clara", "leitores de tela", "Playwright", "Excel", "atendimento ao cliente",
+    "SEO", "métricas de campanha", "pesquisa com usuários", "documentação", "APIs REST",
+]
+_EMPRESAS = ["Empresa X", "Acme", "Lumen", "Horizonte", "Aurora", "Vértice", "Mosaico", "Trilha"]
+
+
+def synthetic_jobs(n: int, seed: int = 42):
+    rnd = random.Random(seed)
+    for i in range(n):
+        area = rnd.choice(AREAS)
+        reqs = rnd.sample(_REQUISITOS, 3)
+        yield {
+            "id": f"vaga-{i}",
+            "titulo": rnd.choice(_CARGOS[area]),
+            "empresa": rnd.choice(_EMPRESAS),
+            "descricao": "Requisitos: " + ", ".join(reqs) + ".",
+            "area": area,
+            "nivel": rnd.choice(NIVEIS),
+            "modelo": rnd.choice(MODELOS),
+            "local": rnd.choice(LOCAIS),
+            "acessibilidade": rnd.sample(ACESSIBILIDADE, rnd.randint(1, 3)),
+            "selo_inclusivo": rnd.random() < 0.4,
+        }
+
+
+job_index = JobIndex()
+
+
+def _bench(n: int) -> None:
+    index = JobIndex()
+    started = time.perf_counter()
+    index.add_many(synthetic_jobs(n))
+    print(f"ingestão: {n} vagas em {time.perf_counter() - started:.2f} s")
+    queries = [
+        dict(q="analista marketing", modelo="Remoto", local="São Paulo"),
+        dict(q="desenvolvedor acessibilidade", nivel="Pleno", acessibilidade=["Leitor de tela"]),
+        dict(q="", area="Dados", modelo="Híbrido"),
+        dict(q="testes", area="QA", acessibilidade=["Leitor de tela", "Navegação por voz"]),
+        dict(q="analista"),
+    ]
+    for query in queries:
+        runs = []
+        for _ in range(50):
+            t0 = time.perf_counter()
+            res = index.search(page_size=20, **query)
+            runs.append((time.perf_counter() - t0) * 1000)
+        runs.sort()
+        print(f"{query}: total={res['total']} p50={runs[25]:.2f} ms p95={runs[47]:.2f} ms")
+
+
+if __name__ == "__main__":
+    import sys
+
+    _bench(int(sys.argv[sys.argv.index("--bench") + 1]) if "--bench" in sys.argv else 100_000)
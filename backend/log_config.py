@@ -0,0 +1,160 @@
+"""Subsistema único de logging do backend.
+
+- Handlers reais (stdout) rodam numa thread de `QueueListener`; o event loop só
+  enfileira o `LogRecord`.
+- A linha JSON é montada uma vez por registro, já na thread do listener.
+- `log_event` aplica amostragem por tipo de evento (limite por segundo).
+- `redact` mascara e trunca texto de usuário antes de ir para o log.
+- `stats()` expõe o volume de logs (emitidos, descartados, bytes).
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+import tracing
+
+LOG_TEXT_MAX = int(os.getenv("LOG_TEXT_MAX", "120"))
+
+# Eventos de alta frequência: máximo de registros por segundo (demais são descartados e contados)
+SAMPLE_RATES: dict[str, float] = {
+    "client.transcript_user": 2.0,
+    "client.transcript_assistant": 2.0,
+    "client.dc_event": 5.0,
+    "client.dc_raw": 1.0,
+    "client.ice": 5.0,
+}
+
+_REDACTIONS = [
+    (re.compile(r"sk-[A-Za-z0-9_\-]{8,}"), "sk-***"),
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "<email>"),
+    (re.compile(r"\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b"), "<cpf>"),
+    (re.compile(r"\(?\b\d{2}\)?\s?9?\d{4}-?\d{4}\b"), "<telefone>"),
+]
+
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_lock = threading.Lock()
+_levels: Counter = Counter()
+_events: Counter = Counter()
+_bytes = 0
+_dropped: Counter = Counter()
+_buckets: dict[str, list[float]] = {}  # evento -> [tokens, último_refill]
+_listener: logging.handlers.QueueListener | None = None
+
+
+def redact(text, limit: int = LOG_TEXT_MAX) -> str | None:
+    """Mascara dados sensíveis (chaves, e-mails, CPF, telefone) e depois trunca."""
+    if text is None:
+        return None
+    text = str(text)
+    # Mascarar antes: um CPF/e-mail cortado no limite já não casaria com as regexes
+    for pattern, repl in _REDACTIONS:
+        text = pattern.sub(repl, text)
+    extra = len(text) - limit
+    return f"{text[:limit]}…(+{extra})" if extra > 0 else text
+
+
+def _allow(event: str) -> bool:
+    rate = SAMPLE_RATES.get(event)
+    if rate is None:
+        return True
+    now = time.monotonic()
+    with _lock:
+        tokens, last = _buckets.get(event, (rate, now))
+        tokens = min(rate, tokens + (now - last) * rate)
+        if tokens < 1.0:
+            _buckets[event] = [tokens, now]
+            _dropped[event] += 1
+            return False
+        _buckets[event] = [tokens - 1.0, now]
+        return True
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, **fields) -> None:
+    """Registra um evento estruturado; os campos só são serializados no listener."""
+    if not logger.isEnabledFor(level) or not _allow(event):
+        return
+    # O listener roda em outra thread: o request id precisa ser capturado aqui
+    rid = tracing.current_request_id()
+    if rid:
+        fields.setdefault("rid", rid)
+    logger.log(level, event, extra={"event": event, "fields": fields})
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        doc = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            doc.update(fields)
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and key not in ("event", "fields"):
+                doc[key] = value
+        if record.exc_info:
+            doc["exc"] = self.formatException(record.exc_info)
+        line = json.dumps(doc, ensure_ascii=False, default=str)
+        global _bytes
+        with _lock:
+            _levels[record.levelname] += 1
+            _events[getattr(record, "event", None) or record.name] += 1
+            _bytes += len(line) + 1
+        return line
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # O QueueHandler padrão formata a mensagem (e o traceback) na thread que loga;
+    # aqui o registro vai intacto e toda a formatação acontece no listener.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: str = "INFO") -> None:
+    """Configura o root logger uma única vez (chamadas repetidas são ignoradas)."""
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    root = logging.getLogger()
+    root.handlers[:] = [_DeferredQueueHandler(log_queue)]
+    root.setLevel(level)
+    # Uvicorn instala handlers próprios (síncronos); redireciona tudo para a fila
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uv = logging.getLogger(name)
+        uv.handlers.clear()
+        uv.propagate = True
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Esvazia a fila e para a thread do listener (chamar no fim do lifespan)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def stats() -> dict:
+    with _lock:
+        return {
+            "levels": dict(_levels),
+            "events": dict(_events),
+            "bytes": _bytes,
+            "dropped": dict(_dropped),
+            "sample_rates": dict(SAMPLE_RATES),
+        }
@@ -0,0 +1,297 @@
+"""Compatibilidade candidato ↔ vaga com embeddings e ranking vetorizado.
+
+- `Embedder` é plugável (`EMBEDDING_BACKEND`): `local` (hashing determinístico,
+  sem rede, usado por padrão e em testes) ou `openai`.
+- Embeddings de vagas ficam numa matriz float32 normalizada, contígua e
+  append-only em disco (`MATCH_DIR/<modelo>.f32`), aberta via `np.memmap`;
+  o manifesto ao lado (`<modelo>.hashes`, também append-only) guarda o hash
+  de conteúdo de cada linha. Vaga com o
+  mesmo conteúdo nunca é reembedada, nem entre reinícios.
+- Ranking = `M @ q` (ou `Q @ M.T` em lote) + bônus por requisitos de
+  acessibilidade atendidos, e top-k com `argpartition`. Nenhuma chamada ao
+  modelo por vaga no momento da consulta.
+- O sync (embedar vagas novas) roda numa thread própria, disparada pela
+  ingestão; a consulta lê o último snapshot publicado e nunca espera o sync.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from job_index import JobIndex, ACESSIBILIDADE, job_index, normalize, tokenize
+from log_config import log_event
+
+logger = logging.getLogger(__name__)
+
+MATCH_DIR = Path(os.getenv("MATCH_DIR", "embeddings"))
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "local")
+# Peso do bônus quando a vaga atende a todas as necessidades de acessibilidade do candidato
+ACCESS_BOOST = float(os.getenv("MATCH_ACCESS_BOOST", "0.15"))
+
+_ACCESS_BITS = {normalize(v): 1 << i for i, v in enumerate(ACESSIBILIDADE)}
+# popcount de uint8 por tabela (vetorizado com indexação)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.float32)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def access_mask(features) -> int:
+    mask = 0
+    for feature in features or ():
+        mask |= _ACCESS_BITS.get(normalize(feature), 0)
+    return mask
+
+
+def job_text(job: dict) -> str:
+    return ". ".join(str(job.get(k) or "") for k in ("titulo", "area", "nivel", "descricao"))
+
+
+def profile_text(cargo: str, experiencia: str) -> str:
+    return f"{cargo}. {experiencia}"
+
+
+# ---------- embedders ----------
+class HashingEmbedder:
+    """Stand-in local e determinístico: unigramas + bigramas em hashing assinado."""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            toks = tokenize(text)
+            for feat in toks + [f"{a}_{b}" for a, b in zip(toks, toks[1:])]:
+                h = zlib.crc32(feat.encode("utf-8"))
+                out[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+class OpenAIEmbedder:
+    def __init__(self, model: str = "text-embedding-3-small", dim: int = 1536, batch: int = 256):
+        self.model = model
+        self.dim = dim
+        self.batch = batch
+        self.name = re.sub(r"[^a-z0-9-]", "-", model.lower())
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        from openai_client import get_client
+
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), self.batch):
+            chunk = texts[start:start + self.batch]
+            resp = get_client().embeddings.create(model=self.model, input=chunk)
+            out[start:start + len(chunk)] = [d.embedding for d in resp.data]
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+def get_embedder():
+    if EMBEDDING_BACKEND == "openai":
+        return OpenAIEmbedder()
+    return HashingEmbedder()
+
+
+# ---------- matriz de vagas ----------
+class _Snapshot(NamedTuple):
+    """Estado imutável lido pelas consultas; o sync publica um novo a cada rodada."""
+    matrix: np.ndarray
+    # Espelho do JobIndex, alinhado pelo doc id interno (append-only; substituídas e
+    # removidas ficam mortas em `alive`, como no próprio índice)
+    job_ids: list[str]
+    position: dict[str, int]
+    rows: np.ndarray
+    access: np.ndarray
+    alive: np.ndarray
+    n_alive: int
+
+
+class JobMatrix:
+    def __init__(self, index: JobIndex, embedder, directory: Path = MATCH_DIR):
+        self.index = index
+        self.embedder = embedder
+        self._path = directory / f"{embedder.name}.f32"
+        self._manifest_path = directory / f"{embedder.name}.hashes"
+        # Serializa os syncs; consultas não o tomam
+        self._sync_lock = threading.Lock()
+        self._row_of_hash: dict[str, int] = {}
+        self._matrix = np.zeros((0, embedder.dim), dtype=np.float32)
+        self._synced_version = -1
+        self._snapshot = _Snapshot(
+            self._matrix, [], {}, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.bool_), 0,
+        )
+        self._profiles: OrderedDict = OrderedDict()
+        self._profiles_lock = threading.Lock()
+        self._pending = threading.Event()
+        self._worker: threading.Thread | None = None
+
+    def _open(self, rows: int) -> None:
+        if rows:
+            self._matrix = np.memmap(self._path, dtype=np.float32, mode="r", shape=(rows, self.embedder.dim))
+
+    def load(self) -> None:
+        """Reabre a matriz e o manifesto já gravados (reinício sem reembedar)."""
+        if not self._manifest_path.exists() or not self._path.exists():
+            return
+        with open(self._manifest_path, "r", encoding="utf-8") as f:
+            hashes = f.read().split()
+        expected = len(hashes) * self.embedder.dim * 4
+        if self._path.stat().st_size != expected:
+            # Gravação interrompida: descarta e reembeda no próximo sync
+            self._path.unlink()
+            return
+        self._row_of_hash = {h: i for i, h in enumerate(hashes)}
+        self._open(len(hashes))
+
+    def sync(self) -> int:
+        """Processa só os docs indexados desde o último sync; embeda os de conteúdo novo."""
+        with self._sync_lock:
+            if self._synced_version == self.index.version:
+                return 0
+            version = self.index.version
+            snap = self._snapshot
+            jobs, alive = self.index.docs_since(len(snap.job_ids))
+            hashes = [content_hash(job_text(j)) for j in jobs]
+            missing = {}
+            for job, h in zip(jobs, hashes):
+                if h not in self._row_of_hash and h not in missing:
+                    missing[h] = job_text(job)
+            if missing:
+                vectors = self.embedder.embed(list(missing.values())).astype(np.float32, copy=False)
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                # "w" quando não há manifesto válido: nunca anexar a um arquivo órfão
+                mode = "a" if self._row_of_hash else "w"
+                with open(self._path, mode + "b") as f:
+                    f.write(np.ascontiguousarray(vectors).tobytes())
+                # Só as linhas novas: reescrever o manifesto inteiro custaria O(catálogo) por ingestão
+                with open(self._manifest_path, mode, encoding="utf-8") as f:
+                    f.write("".join(h + "\n" for h in missing))
+                base = len(self._row_of_hash)
+                for offset, h in enumerate(missing):
+                    self._row_of_hash[h] = base + offset
+                self._open(len(self._row_of_hash))
+            # Cópias: o snapshot anterior pode estar sendo lido por uma consulta
+            job_ids = snap.job_ids + [j["id"] for j in jobs]
+            position = dict(snap.position)
+            for doc in range(len(snap.job_ids), len(job_ids)):
+                position[job_ids[doc]] = doc
+            rows = np.fromiter((self._row_of_hash[h] for h in hashes), dtype=np.int64, count=len(hashes))
+            access = np.fromiter((access_mask(j.get("acessibilidade")) for j in jobs), dtype=np.uint8, count=len(jobs))
+            self._snapshot = _Snapshot(
+                self._matrix, job_ids, position,
+                np.concatenate([snap.rows, rows]), np.concatenate([snap.access, access]),
+                alive, int(alive.sum()),
+            )
+            self._synced_version = version
+            return len(missing)
+
+    def request_sync(self) -> None:
+        """Agenda um sync na thread de fundo; pedidos seguidos viram uma única rodada."""
+        self._pending.set()
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._sync_loop, name="job-matrix-sync", daemon=True)
+            self._worker.start()
+
+    def _sync_loop(self) -> None:
+        while True:
+            self._pending.wait()
+            self._pending.clear()
+            try:
+                embedded = self.sync()
+                log_event(logger, "matching.sync", embedded=embedded, vagas=self._snapshot.n_alive)
+            except Exception:
+                logger.exception("matching.sync_failed")
+
+    @property
+    def ready(self) -> bool:
+        return self._synced_version >= 0
+
+    def embed_profile(self, text: str) -> np.ndarray:
+        key = content_hash(text)
+        with self._profiles_lock:
+            vec = self._profiles.get(key)
+            if vec is not None:
+                self._profiles.move_to_end(key)
+                return vec
+        vec = self.embedder.embed([text])[0]
+        with self._profiles_lock:
+            self._profiles[key] = vec
+            if len(self._profiles) > 1024:
+                self._profiles.popitem(last=False)
+        return vec
+
+    @staticmethod
+    def _scores(snap: _Snapshot, queries: np.ndarray, needs: np.ndarray, cols: list[int] | None = None) -> np.ndarray:
+        """(n_perfis, n_vagas): similaridade + bônus de acessibilidade, vetorizado."""
+        if cols is None:
+            # Produto sobre a matriz inteira (memmap) e depois as linhas de cada doc
+            sims = (queries @ snap.matrix.T)[:, snap.rows]
+            access = snap.access
+        else:
+            sims = queries @ snap.matrix[snap.rows[cols]].T
+            access = snap.access[cols]
+        met = _POPCOUNT[access[None, :] & needs[:, None]]
+        wanted = np.maximum(_POPCOUNT[needs], 1.0)[:, None]
+        boost = np.where(needs[:, None] > 0, ACCESS_BOOST * met / wanted, 0.0)
+        return sims + boost
+
+    def _queries(self, profiles: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+        queries = np.stack([self.embed_profile(p["texto"]) for p in profiles])
+        needs = np.array([access_mask(p.get("acessibilidade")) for p in profiles], dtype=np.uint8)
+        return queries, needs
+
+    def rank(self, profiles: list[dict], k: int = 10) -> list[list[tuple[str, float]]]:
+        """Top-k por perfil (`{"texto", "acessibilidade"}`), em lote, sobre o snapshot atual."""
+        snap = self._snapshot
+        scores = self._scores(snap, *self._queries(profiles))
+        scores[:, ~snap.alive] = -np.inf
+        k = min(k, snap.n_alive)
+        results = []
+        for row in scores:
+            if k == 0:
+                results.append([])
+                continue
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top])]
+            results.append([(snap.job_ids[i], float(row[i])) for i in top])
+        return results
+
+    def score_ids(self, profile: dict, job_ids: list[str]) -> dict[str, float]:
+        snap = self._snapshot
+        cols = [snap.position[j] for j in job_ids if j in snap.position and snap.alive[snap.position[j]]]
+        if not cols:
+            return {}
+        scores = self._scores(snap, *self._queries([profile]), cols=cols)[0]
+        return {snap.job_ids[c]: float(v) for c, v in zip(cols, scores)}
+
+
+def compatibilidade(score: float) -> int:
+    """Escala o score (cosseno + bônus) para o percentual exibido no card."""
+    return int(round(100 * min(1.0, max(0.0, score))))
+
+
+def explicar(profile: dict, job: dict) -> str:
+    """Explicação curta: termos em comum e necessidades de acessibilidade atendidas."""
+    comuns = sorted(set(tokenize(profile["texto"])) & set(tokenize(job_text(job))))[:4]
+    atendidas = [a for a in profile.get("acessibilidade") or [] if access_mask([a]) & access_mask(job.get("acessibilidade"))]
+    partes = []
+    if comuns:
+        partes.append("em comum: " + ", ".join(comuns))
+    if atendidas:
+        partes.append("atende: " + ", ".join(atendidas))
+    return "; ".join(partes) or "baixa sobreposição com o perfil"
+
+
+job_matrix = JobMatrix(job_index, get_embedder())
@@ -0,0 +1,40 @@
+"""Resolução da chave e cliente OpenAI compartilhado, criado sob demanda.
+
+O SDK da OpenAI é pesado para importar; só é carregado no primeiro uso.
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional
+
+
+def read_secret(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            value = f.read().strip()
+            return value or None
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Do not leak details
+        return None
+
+
+def resolve_api_key() -> Optional[str]:
+    # Prefer Swarm secret if available
+    secret = read_secret("/run/secrets/openai_api_key")
+    if secret:
+        return secret
+    return os.getenv("OPENAI_API_KEY") or os.getenv("API_KEY")
+
+
+def is_configured() -> bool:
+    return resolve_api_key() is not None
+
+
+@lru_cache(maxsize=1)
+def get_client():
+    """Cliente síncrono único, reutilizado por todas as rotas (pool HTTP compartilhado)."""
+    from openai import OpenAI
+
+    return OpenAI(api_key=resolve_api_key())
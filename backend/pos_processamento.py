@@ -0,0 +1,90 @@
+"""Pós-processamento de fala gerada: corte de silêncio nas bordas e loudness uniforme.
+
+Entrada: PCM cru do TTS (`response_format="pcm"`: 24 kHz, int16 LE, mono),
+lido de disco via `np.memmap` em blocos de tamanho fixo. Duas passadas:
+
+1. energia por quadro de 10 ms (vetorizado por bloco) + pico;
+2. aplica o ganho só no trecho com voz e codifica no formato pedido
+   (`soundfile`), bloco a bloco.
+
+A memória fica constante no tamanho do bloco; o único array proporcional à
+duração é a energia por quadro (1 float a cada 10 ms).
+"""
+
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+
+PCM_RATE = 24_000
+QUADRO = PCM_RATE // 100
+BLOCO = QUADRO * 1000  # 10 s por bloco
+# Margem mantida antes/depois da voz para não cortar ataques e finais de sílaba
+MARGEM_QUADROS = 10
+
+ALVO_DBFS = float(os.getenv("TTS_ALVO_DBFS", "-20"))
+SILENCIO_DBFS = float(os.getenv("TTS_SILENCIO_DBFS", "-45"))
+PICO_DBFS = -1.0
+
+# formato pedido -> (container soundfile, subtipo, extensão, media type)
+FORMATOS = {
+    "mp3": ("MP3", "MPEG_LAYER_III", ".mp3", "audio/mpeg"),
+    "opus": ("OGG", "OPUS", ".opus", "audio/ogg"),
+    "wav": ("WAV", "PCM_16", ".wav", "audio/wav"),
+    "pcm": ("RAW", "PCM_16", ".pcm", "audio/L16;rate=24000"),
+}
+
+
+def _energia(amostras: np.ndarray) -> tuple[np.ndarray, float]:
+    """Energia média (quadrática) por quadro e pico absoluto, em escala [-1, 1]."""
+    n_quadros = math.ceil(len(amostras) / QUADRO)
+    energia = np.empty(n_quadros, dtype=np.float32)
+    pico = 0.0
+    for inicio in range(0, len(amostras), BLOCO):
+        bloco = np.asarray(amostras[inicio:inicio + BLOCO], dtype=np.float32) / 32768.0
+        falta = -len(bloco) % QUADRO
+        if falta:
+            bloco = np.pad(bloco, (0, falta))
+        quadros = bloco.reshape(-1, QUADRO)
+        q0 = inicio // QUADRO
+        energia[q0:q0 + len(quadros)] = np.einsum("ij,ij->i", quadros, quadros) / QUADRO
+        pico = max(pico, float(np.abs(bloco).max()))
+    return energia, pico
+
+
+def analisar(amostras: np.ndarray) -> tuple[int, int, float]:
+    """(início, fim, ganho): trecho com voz, em amostras, e ganho linear a aplicar."""
+    energia, pico = _energia(amostras)
+    voz = np.flatnonzero(energia > 10 ** (SILENCIO_DBFS / 10))
+    if voz.size == 0:
+        return 0, len(amostras), 1.0
+    inicio = max(0, int(voz[0]) - MARGEM_QUADROS) * QUADRO
+    fim = min(len(amostras), (int(voz[-1]) + 1 + MARGEM_QUADROS) * QUADRO)
+    # Loudness "com gate": RMS só dos quadros com voz, igual entre clipes curtos e longos
+    rms = math.sqrt(float(energia[voz].mean()))
+    ganho = min(10 ** (ALVO_DBFS / 20) / rms, 10 ** (PICO_DBFS / 20) / max(pico, 1e-9))
+    return inicio, fim, ganho
+
+
+def processar_pcm(origem: Path, destino: Path, formato: str) -> dict:
+    """Corta silêncio, normaliza e grava `destino` no formato pedido."""
+    import soundfile as sf
+
+    container, subtipo, _, _ = FORMATOS[formato]
+    amostras = np.memmap(origem, dtype="<i2", mode="r")
+    if len(amostras) == 0:
+        raise ValueError("Áudio vazio.")
+    inicio, fim, ganho = analisar(amostras)
+    escala = np.float32(ganho / 32768.0)
+    extra = {"endian": "LITTLE"} if container == "RAW" else {}
+    with sf.SoundFile(destino, "w", samplerate=PCM_RATE, channels=1, format=container, subtype=subtipo, **extra) as saida:
+        for pos in range(inicio, fim, BLOCO):
+            bloco = np.asarray(amostras[pos:min(pos + BLOCO, fim)], dtype=np.float32) * escala
+            np.clip(bloco, -1.0, 1.0, out=bloco)
+            saida.write(bloco)
+    return {
+        "duracao_s": round((fim - inicio) / PCM_RATE, 3),
+        "silencio_removido_s": round((len(amostras) - (fim - inicio)) / PCM_RATE, 3),
+        "ganho_db": round(20 * math.log10(ganho), 2),
+    }
@@ -0,0 +1,90 @@
+"""Cache de sessões Realtime por `client_id` e métricas de conexão.
+
+Quando o iframe `/webrtc` é recarregado (rerun do Streamlit, troca de página),
+o mesmo `client_id` volta a pedir `/session`; enquanto o segredo efêmero
+ainda for válido, a sessão já emitida é devolvida sem criar outra na OpenAI.
+"""
+
+import time
+from collections import deque
+
+# Margem para o navegador ainda conseguir concluir o SDP com o token
+EXPIRY_MARGIN_S = 10
+MAX_ENTRIES = 1000
+# Marcas emitidas pelo webrtc.js; outros nomes vindos do /logs (sem autenticação) são ignorados
+CALL_PHASES = ("start", "session", "mic", "offer", "ice", "sdp", "connected", "remote_track", "first_response")
+
+
+def _percentiles(values) -> dict:
+    samples = sorted(values)
+
+    def pct(p: float) -> float | None:
+        return round(samples[min(len(samples) - 1, int(p * len(samples)))], 1) if samples else None
+
+    return {"count": len(samples), "p50": pct(0.5), "p95": pct(0.95)}
+
+
+def _expires_at(session: dict) -> float | None:
+    secret = session.get("client_secret")
+    if isinstance(secret, dict) and secret.get("expires_at"):
+        return float(secret["expires_at"])
+    return None
+
+
+class SessionCache:
+    def __init__(self):
+        self._entries: dict[str, tuple[float, dict]] = {}
+        self._reconnect_ms: deque = deque(maxlen=200)
+        self._phases: dict[str, deque] = {}
+        self.minted = 0
+        self.resumed = 0
+
+    def get(self, client_id: str | None) -> dict | None:
+        if not client_id:
+            return None
+        entry = self._entries.get(client_id)
+        if entry is None:
+            return None
+        expires_at, session = entry
+        if expires_at - EXPIRY_MARGIN_S <= time.time():
+            del self._entries[client_id]
+            return None
+        self.resumed += 1
+        return session
+
+    def put(self, client_id: str | None, session: dict) -> None:
+        self.minted += 1
+        expires_at = _expires_at(session)
+        if not client_id or expires_at is None:
+            return
+        if len(self._entries) >= MAX_ENTRIES:
+            now = time.time()
+            self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            if len(self._entries) >= MAX_ENTRIES:
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[client_id] = (expires_at, session)
+
+    def discard(self, client_id: str | None) -> None:
+        if client_id:
+            self._entries.pop(client_id, None)
+
+    def record_reconnect(self, ms: float) -> None:
+        self._reconnect_ms.append(float(ms))
+
+    def record_call_timing(self, phases: dict) -> None:
+        """Marcas por fase do `webrtc.js` (ms desde o início da navegação do iframe)."""
+        for name, ms in phases.items():
+            if name in CALL_PHASES and isinstance(ms, (int, float)):
+                self._phases.setdefault(name, deque(maxlen=200)).append(float(ms))
+
+    def stats(self) -> dict:
+        return {
+            "minted": self.minted,
+            "resumed": self.resumed,
+            "cached": len(self._entries),
+            "reconnect_ms": _percentiles(self._reconnect_ms),
+            "call_phases_ms": {name: _percentiles(v) for name, v in self._phases.items()},
+        }
+
+
+session_cache = SessionCache()
@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel
+
+import tracing
+from analise_fala import AnaliseFala, TAXA
+from log_config import log_event
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/analise", tags=["Análise da entrevista"])
+
+# Resultados por client_id (`<client_id>.json`), lidos pelos cards de Feedback e Home
+ANALISE_DIR = Path(os.getenv("ANALISE_DIR", "analises"))
+# Sessão sem blocos novos por esse tempo é finalizada sozinha (aba fechada sem aviso)
+ANALISE_IDLE_S = int(os.getenv("ANALISE_IDLE_S", "60"))
+ANALISE_MAX_ATIVAS = int(os.getenv("ANALISE_MAX_ATIVAS", "200"))
+ANALISE_HISTORICO = 20
+# 4 s de PCM 16 kHz int16 por bloco, no máximo (o navegador envia ~2 s)
+BLOCO_MAX_BYTES = 4 * TAXA * 2
+MODO_MAX = 10_000
+# Históricos em memória (LRU); o que sai daqui é relido do disco na próxima consulta
+RESULTADOS_MAX = 1_000
+
+
+def _valid_id(value: str) -> bool:
+    return 0 < len(value) <= 64 and all(c.isalnum() or c == "-" for c in value)
+
+
+class Sessao:
+    __slots__ = ("client_id", "analise", "seq", "visto")
+
+    def __init__(self, client_id: str):
+        self.client_id = client_id
+        self.analise = AnaliseFala()
+        self.seq = 0
+        self.visto = time.monotonic()
+
+
+class AnalisesEntrevista:
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._ativas: dict[tuple[str, str], Sessao] = {}
+        self._resultados: OrderedDict[str, deque] = OrderedDict()
+        # client_id -> candidato está na página Entrevista (informado pelo Streamlit). O widget
+        # de voz continua aberto nas outras páginas, mas comandos e conversa ali não são entrevista
+        self._modo: OrderedDict[str, bool] = OrderedDict()
+
+    def em_entrevista(self, client_id: str) -> bool:
+        # Sem aviso do Streamlit (ex.: /webrtc aberto direto numa aba), toda a chamada é entrevista
+        return self._modo.get(client_id, True)
+
+    def definir_modo(self, client_id: str, entrevista: bool) -> None:
+        self._modo[client_id] = entrevista
+        self._modo.move_to_end(client_id)
+        while len(self._modo) > MODO_MAX:
+            self._modo.popitem(last=False)
+        if not entrevista:
+            # Saiu da página: a entrevista em andamento termina aqui
+            for chave in [k for k in self._ativas if k[0] == client_id]:
+                self.finalizar(*chave)
+
+    def _arquivo(self, client_id: str) -> Path:
+        return self.directory / f"{client_id}.json"
+
+    def historico(self, client_id: str, criar: bool = False) -> deque:
+        hist = self._resultados.get(client_id)
+        if hist is None:
+            hist = deque(maxlen=ANALISE_HISTORICO)
+            path = self._arquivo(client_id)
+            if path.exists():
+                with open(path, "r", encoding="utf-8") as f:
+                    hist.extend(json.load(f))
+            # Consultas de ids sem análise não ocupam memória
+            if hist or criar:
+                self._resultados[client_id] = hist
+                while len(self._resultados) > RESULTADOS_MAX:
+                    self._resultados.popitem(last=False)
+        else:
+            self._resultados.move_to_end(client_id)
+        return hist
+
+    def alimentar(self, client_id: str, sessao: str, seq: int, pcm: np.ndarray) -> int:
+        self.expirar()
+        if not self.em_entrevista(client_id):
+            return -1
+        chave = (client_id, sessao)
+        atual = self._ativas.get(chave)
+        if atual is None:
+            if seq != 0:
+                # Sessão já finalizada (ou expirada): blocos atrasados são ignorados
+                return -1
+            if len(self._ativas) >= ANALISE_MAX_ATIVAS:
+                raise HTTPException(status_code=503, detail="Muitas análises simultâneas.", headers={"Retry-After": "10"})
+            atual = self._ativas[chave] = Sessao(client_id)
+        if seq < atual.seq:
+            return atual.seq  # reenvio: idempotente
+        if seq > atual.seq:
+            raise HTTPException(status_code=409, detail={"esperado": atual.seq})
+        atual.analise.alimentar(pcm)
+        atual.seq += 1
+        atual.visto = time.monotonic()
+        return atual.seq
+
+    def finalizar(self, client_id: str, sessao: str) -> dict | None:
+        atual = self._ativas.pop((client_id, sessao), None)
+        if atual is None:
+            return None
+        resultado = {"sessao": sessao, "finalizada_em": time.time(), **atual.analise.finalizar()}
+        hist = self.historico(client_id, criar=True)
+        hist.append(resultado)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self._arquivo(client_id).with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(list(hist), f, ensure_ascii=False)
+        os.replace(tmp, self._arquivo(client_id))
+        log_event(logger, "analise.finalizada", client_id=client_id, duracao_s=resultado["duracao_s"], nota=resultado["nota"])
+        return resultado
+
+    def expirar(self) -> None:
+        limite = time.monotonic() - ANALISE_IDLE_S
+        for client_id, sessao in [k for k, s in self._ativas.items() if s.visto < limite]:
+            self.finalizar(client_id, sessao)
+
+    def stats(self) -> dict:
+        return {"ativas": len(self._ativas), "clientes": len(self._resultados)}
+
+
+analises = AnalisesEntrevista(ANALISE_DIR)
+
+
+@router.post("/{client_id}/audio")
+async def receber_audio(
+    client_id: str,
+    request: Request,
+    sessao: str = Query(..., max_length=64),
+    seq: int = Query(..., ge=0),
+):
+    """Bloco de PCM 16 kHz int16 LE mono, em ordem (`seq` 0, 1, 2…) por sessão de chamada."""
+    if not _valid_id(client_id) or not _valid_id(sessao):
+        raise HTTPException(status_code=400, detail="Identificador inválido.")
+    # Recusa antes de ler: nem o Content-Length declarado nem o corpo real passam do limite
+    declarado = request.headers.get("content-length")
+    if declarado is not None and (not declarado.isdigit() or int(declarado) > BLOCO_MAX_BYTES):
+        raise HTTPException(status_code=413, detail="Bloco de áudio inválido.")
+    corpo = bytearray()
+    async for parte in request.stream():
+        corpo += parte
+        if len(corpo) > BLOCO_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Bloco de áudio inválido.")
+    if len(corpo) % 2:
+        raise HTTPException(status_code=413, detail="Bloco de áudio inválido.")
+    with tracing.span("analise.bloco", bytes=len(corpo)):
+        proximo = analises.alimentar(client_id, sessao, seq, np.frombuffer(corpo, dtype="<i2"))
+    # `entrevista: false`: o navegador finaliza a sessão e para de enviar até voltar à página
+    return {"proximo": proximo, "entrevista": analises.em_entrevista(client_id)}
+
+
+@router.post("/{client_id}/finalizar")
+async def finalizar(client_id: str, sessao: str = Query(..., max_length=64)):
+    """Fim da chamada: só fecha o estado incremental, sem reprocessar o áudio."""
+    resultado = analises.finalizar(client_id, sessao)
+    if resultado is None:
+        raise HTTPException(status_code=404, detail="Sessão de análise não encontrada.")
+    return resultado
+
+
+class Modo(BaseModel):
+    entrevista: bool
+
+
+@router.post("/{client_id}/modo")
+async def definir_modo(client_id: str, modo: Modo):
+    """Streamlit avisa quando o candidato entra ou sai da página Entrevista."""
+    if not _valid_id(client_id):
+        raise HTTPException(status_code=400, detail="Identificador inválido.")
+    analises.definir_modo(client_id, modo.entrevista)
+    return {"entrevista": modo.entrevista}
+
+
+@router.get("/{client_id}/modo")
+async def obter_modo(client_id: str):
+    return {"entrevista": analises.em_entrevista(client_id)}
+
+
+@router.get("/stats")
+async def stats():
+    return analises.stats()
+
+
+@router.get("/{client_id}")
+async def resultados(client_id: str):
+    """Última análise + histórico do candidato (cards de Feedback e KPIs da Home)."""
+    if not _valid_id(client_id):
+        raise HTTPException(status_code=400, detail="Identificador inválido.")
+    # Chamada encerrada sem /finalizar (aba fechada): o resultado sai aqui
+    analises.expirar()
+    hist = list(analises.historico(client_id))
+    # Sessões curtas demais para avaliar (ex.: recarga do iframe) não contam como entrevista
+    avaliadas = [r for r in hist if r.get("nota") is not None]
+    return {
+        "ultima": (avaliadas or hist)[-1] if hist else None,
+        "entrevistas": len(avaliadas),
+        "nota_media": round(sum(r["nota"] for r in avaliadas) / len(avaliadas), 1) if avaliadas else None,
+        "historico": hist,
+    }
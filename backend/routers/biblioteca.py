@@ -0,0 +1,40 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, RedirectResponse
+
+from biblioteca_audio import biblioteca_audio
+
+router = APIRouter(prefix="/biblioteca", tags=["Biblioteca"])
+
+# O conteúdo de uma URL versionada nunca muda: o navegador/CDN pode guardá-la indefinidamente
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+
+
+@router.get("/audio")
+async def listar():
+    """Manifesto com a URL versionada de cada narração (usada pelo frontend)."""
+    return {"itens": biblioteca_audio.listar(), "completa": biblioteca_audio.completa}
+
+
+@router.get("/audio/{entrada_id}")
+async def atual(entrada_id: str):
+    """Redireciona para a versão atual; o redirecionamento em si não é cacheado."""
+    entrada = biblioteca_audio.entradas.get(entrada_id)
+    if entrada is None:
+        raise HTTPException(status_code=404, detail="Narração não encontrada.")
+    return RedirectResponse(
+        f"/biblioteca/audio/{entrada_id}/{entrada['versao']}.mp3",
+        status_code=307,
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.get("/audio/{entrada_id}/{versao}.mp3")
+async def audio(entrada_id: str, versao: str):
+    # Só ids do manifesto e versões hex: nada do caminho vem cru do cliente
+    if entrada_id not in biblioteca_audio.entradas or len(versao) != 12 or not all(c in "0123456789abcdef" for c in versao):
+        raise HTTPException(status_code=404, detail="Narração não encontrada.")
+    caminho = biblioteca_audio.caminho(entrada_id, versao)
+    if not caminho.exists():
+        # Nunca sintetiza aqui: entradas ausentes são responsabilidade do render
+        raise HTTPException(status_code=404, detail="Narração ainda não renderizada.")
+    return FileResponse(caminho, media_type="audio/mpeg", headers={"Cache-Control": CACHE_IMUTAVEL, "ETag": f'"{versao}"'})
@@ -0,0 +1,52 @@
+import logging
+import time
+from collections import OrderedDict
+
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+
+import tracing
+from comandos_voz import roteador
+from log_config import log_event, redact
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/comandos", tags=["Comandos de voz"])
+
+# Último comando resolvido localmente por client_id, consumido pelo Streamlit
+_pendentes: OrderedDict[str, dict] = OrderedDict()
+PENDENTES_MAX = 10_000
+PENDENTE_TTL_S = 30
+
+
+class ComandoRequest(BaseModel):
+    texto: str = Field(..., max_length=500)
+    client_id: str | None = Field(None, max_length=64)
+
+
+@router.post("/interpretar")
+async def interpretar(request: ComandoRequest):
+    """Resolve navegação/busca/acessibilidade localmente; `llm: true` = deixar o modelo responder."""
+    with tracing.span("comandos.interpretar"):
+        resultado = roteador.interpretar(request.texto)
+    log_event(logger, "comandos.interpretar", intencao=resultado["intencao"], ms=resultado["ms"], preview=redact(request.texto))
+    if not resultado["llm"] and request.client_id:
+        _pendentes[request.client_id] = {**resultado, "ts": time.time()}
+        _pendentes.move_to_end(request.client_id)
+        while len(_pendentes) > PENDENTES_MAX:
+            _pendentes.popitem(last=False)
+    return resultado
+
+
+@router.get("/stats")
+async def stats():
+    """Taxa de acerto local vs. fallback para o modelo e latência (ms)."""
+    return roteador.stats()
+
+
+@router.get("/{client_id}/pendente")
+async def pendente(client_id: str):
+    comando = _pendentes.pop(client_id, None)
+    if comando is None or time.time() - comando["ts"] > PENDENTE_TTL_S:
+        return {"comando": None}
+    return {"comando": comando}
@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+import tracing
+from extracao_curriculo import EXTRATORES, processar
+from log_config import log_event
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/curriculo", tags=["Currículo"])
+
+# Resultados extraídos (`<sha256>.json`). O arquivo recebido (`upload-<uuid><ext>`)
+# só existe até o fim da extração: currículo é dado pessoal e o cache não precisa dele
+CURRICULO_DIR = Path(os.getenv("CURRICULO_DIR", "curriculos"))
+CURRICULO_MAX_MB = int(os.getenv("CURRICULO_MAX_MB", "10"))
+CURRICULO_WORKERS = int(os.getenv("CURRICULO_WORKERS", str(os.cpu_count() or 2)))
+# Importações em lote: limita quantos arquivos aguardam o pool ao mesmo tempo
+CURRICULO_FILA_MAX = int(os.getenv("CURRICULO_FILA_MAX", "1000"))
+
+
+class Importacoes:
+    """Estado das importações em memória, indexado pelo hash do arquivo.
+
+    O hash é o id da importação: reenviar o mesmo currículo (comum em lotes de
+    ONGs parceiras) reaproveita o resultado em vez de extrair de novo.
+    """
+
+    def __init__(self, directory: Path, workers: int, limit: int = 10_000):
+        self.directory = directory
+        self.workers = workers
+        self.limit = limit
+        self._status: OrderedDict[str, dict] = OrderedDict()
+        self._pool: ProcessPoolExecutor | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.cache_hits = 0
+
+    def _pool_get(self) -> ProcessPoolExecutor:
+        # Criado sob demanda: o startup não paga pelos processos se ninguém importar
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _set(self, digest: str, state: dict) -> dict:
+        self._status[digest] = state
+        self._status.move_to_end(digest)
+        while len(self._status) > self.limit:
+            self._status.popitem(last=False)
+        return state
+
+    def _cached(self, digest: str) -> dict | None:
+        path = self.directory / f"{digest}.json"
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def get(self, digest: str) -> dict | None:
+        state = self._status.get(digest)
+        if state is None:
+            cached = self._cached(digest)
+            if cached is not None:
+                state = self._set(digest, {"id": digest, "status": "concluido", **cached})
+        return state
+
+    @property
+    def pendentes(self) -> int:
+        return len(self._tasks)
+
+    def submeter(self, digest: str, arquivo: Path) -> dict:
+        """Assume o arquivo recebido: ele é apagado ao fim da extração (ou já, se houver cache)."""
+        state = self.get(digest)
+        if state is not None and state["status"] != "erro":
+            self.cache_hits += 1
+            arquivo.unlink(missing_ok=True)
+            return {**state, "cache": True}
+        state = self._set(digest, {"id": digest, "status": "processando"})
+        task = asyncio.create_task(self._extrair(digest, arquivo))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return state
+
+    async def _extrair(self, digest: str, arquivo: Path) -> None:
+        loop = asyncio.get_running_loop()
+        # Trace próprio: o da requisição de upload já foi finalizado quando a extração roda
+        trace, token = tracing.begin("curriculo.extrair")
+        tracing.annotate(importacao=digest[:12])
+        try:
+            with tracing.span("curriculo.extract", formato=arquivo.suffix):
+                resultado = await loop.run_in_executor(self._pool_get(), processar, str(arquivo))
+            tmp = self.directory / f"{digest}.json.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(resultado, f, ensure_ascii=False)
+            os.replace(tmp, self.directory / f"{digest}.json")
+            self._set(digest, {"id": digest, "status": "concluido", **resultado})
+            log_event(logger, "curriculo.extract.ok", id=digest[:12], caracteres=resultado["caracteres"])
+        except Exception as e:
+            self._set(digest, {"id": digest, "status": "erro", "erro": "Não foi possível ler o arquivo."})
+            log_event(logger, "curriculo.extract.error", logging.WARNING, id=digest[:12], error=type(e).__name__)
+        finally:
+            arquivo.unlink(missing_ok=True)
+            tracing.finish(trace, token)
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        por_status: dict[str, int] = {}
+        for state in self._status.values():
+            por_status[state["status"]] = por_status.get(state["status"], 0) + 1
+        return {"workers": self.workers, "pendentes": self.pendentes, "cache_hits": self.cache_hits, "status": por_status}
+
+
+importacoes = Importacoes(CURRICULO_DIR, CURRICULO_WORKERS)
+
+
+@router.post("/importar", status_code=202)
+async def importar(request: Request, nome: str = Query(..., max_length=255)):
+    """Recebe o arquivo cru no corpo (não multipart), gravando em disco conforme chega.
+
+    Responde logo com o id (hash do conteúdo); a extração roda no pool de
+    processos e o resultado é consultado em `GET /curriculo/{id}`.
+    """
+    ext = Path(nome).suffix.lower()
+    if ext not in EXTRATORES:
+        raise HTTPException(status_code=415, detail="Envie um arquivo PDF, DOC ou DOCX.")
+    if importacoes.pendentes >= CURRICULO_FILA_MAX:
+        raise HTTPException(status_code=503, detail="Fila de importação cheia. Tente novamente em instantes.",
+                            headers={"Retry-After": "5"})
+
+    limite = CURRICULO_MAX_MB * 1024 * 1024
+    digest = hashlib.sha256()
+    tamanho = 0
+    # Um arquivo por upload: dois envios iguais simultâneos não disputam o mesmo caminho
+    arquivo = CURRICULO_DIR / f"upload-{uuid.uuid4().hex}{ext}"
+    try:
+        # open/write/close em thread: em lotes, E/S de disco no handler travaria o event loop
+        with tracing.span("curriculo.upload"):
+            f = await asyncio.to_thread(open, arquivo, "wb")
+            try:
+                async for bloco in request.stream():
+                    tamanho += len(bloco)
+                    if tamanho > limite:
+                        raise HTTPException(status_code=413, detail=f"Arquivo maior que {CURRICULO_MAX_MB} MB.")
+                    digest.update(bloco)
+                    await asyncio.to_thread(f.write, bloco)
+            finally:
+                await asyncio.to_thread(f.close)
+        if tamanho == 0:
+            raise HTTPException(status_code=400, detail="Arquivo vazio.")
+    except BaseException:
+        arquivo.unlink(missing_ok=True)
+        raise
+
+    log_event(logger, "curriculo.upload", id=digest.hexdigest()[:12], bytes=tamanho, formato=ext)
+    return importacoes.submeter(digest.hexdigest(), arquivo)
+
+
+@router.get("/stats")
+async def stats():
+    return importacoes.stats()
+
+
+@router.get("/{importacao_id}")
+async def status(importacao_id: str):
+    """`processando`, `concluido` (com `campos` para o formulário) ou `erro`."""
+    if len(importacao_id) != 64 or not all(c in "0123456789abcdef" for c in importacao_id):
+        raise HTTPException(status_code=404, detail="Importação não encontrada.")
+    state = importacoes.get(importacao_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Importação não encontrada.")
+    return state
@@ -1,20 +1,19 @@
 from fastapi import APIRouter, HTTPException
-from openai import OpenAI
-from PIL import Image
 import os
 import io
 import hashlib
 import base64
-from dotenv import load_dotenv
 
-# Carrega chave do .env
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY") or os.getenv("API_KEY"))
+import tracing
+from openai_client import get_client
 
 router = APIRouter(prefix="/descrever", tags=["Descrição de Imagens"])
 
 def preprocess_image_bytes(path, max_width=1024, jpeg_quality=75):
     """Redimensiona e retorna bytes da imagem otimizada + mime."""
+    # PIL só é carregado na primeira descrição, não no boot
+    from PIL import Image
+
     img = Image.open(path).convert("RGB")
     w, h = img.size
     if w > max_width:
@@ -31,7 +30,8 @@ def sha256_bytes(b: bytes) -> str:
     return h.hexdigest()
 
 def descrever_imagem_(caminho_imagem: str, prompt_extra: str | None = None) -> str:
-    img_bytes, mime = preprocess_image_bytes(caminho_imagem, max_width=1024, jpeg_quality=75)
+    with tracing.span("describe.preprocess"):
+        img_bytes, mime = preprocess_image_bytes(caminho_imagem, max_width=1024, jpeg_quality=75)
 
     base_prompt = """
     <persona>
@@ -100,20 +100,21 @@ def descrever_imagem_(caminho_imagem: str, prompt_extra: str | None = None) -> s
 
     data_url = f"data:{mime};base64,{base64.b64encode(img_bytes).decode('utf-8')}"
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": full_prompt},
-                        {"type": "image_url", "image_url": {"url": data_url}},
-                    ],
-                }
-            ],
-            max_tokens=600,
-            temperature=0.0,
-        )
+        with tracing.span("describe.vision", model="gpt-4o-mini"):
+            response = get_client().chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": full_prompt},
+                            {"type": "image_url", "image_url": {"url": data_url}},
+                        ],
+                    }
+                ],
+                max_tokens=600,
+                temperature=0.0,
+            )
 
         descricao = response.choices[0].message.content
         return descricao
@@ -1,19 +1,17 @@
 from fastapi import APIRouter, HTTPException, Response
-from openai import OpenAI, APIError
 from pydantic import BaseModel, Field
-import os
-from dotenv import load_dotenv
+import hashlib
 import logging
 import uuid
 from pathlib import Path
+from typing import Literal
 
-# Configura o logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
+import tracing
+from log_config import log_event, redact
+from openai_client import get_client
+from pos_processamento import FORMATOS, processar_pcm
 
-# Carrega chave do .env
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY") or os.getenv("API_KEY"))
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/fala", tags=["Fala"])
 
@@ -39,48 +37,84 @@ class TextCondition(BaseModel):
 
 class AudioRequest(BaseModel):
     conditions: list[TextCondition] = Field(..., min_length=1, max_length=1)
+    # opus: redes móveis lentas; wav/pcm: reprodução em streaming; mp3: compatibilidade
+    formato: Literal["mp3", "opus", "wav", "pcm"] = "mp3"
+    # Corta silêncio nas bordas e normaliza o volume entre clipes (ver pos_processamento.py)
+    pos_processar: bool = False
 
-# Define um diretório para armazenar os arquivos de áudio e o cria se não existir
+# Diretório para armazenar os arquivos de áudio (criado no lifespan do app)
 AUDIO_DIR = Path("audio_gerado")
-AUDIO_DIR.mkdir(exist_ok=True)
+
+TTS_MODEL = "gpt-4o-mini-tts"
+TTS_VOICE = "sage"
+# Instrução de idioma como prompt oculto (não será narrado)
+PROMPT_OCULTO = "[Instrução: Fale em português do Brasil (pt-BR). Não leia esta instrução em voz alta.]"
+
+
+def versao_fala(texto: str) -> str:
+    """Hash do que determina o áudio (texto falado + modelo/voz/instrução)."""
+    chave = "\n".join((TTS_MODEL, TTS_VOICE, PROMPT_OCULTO, aplicar_regras_fala(texto)))
+    return hashlib.sha256(chave.encode("utf-8")).hexdigest()[:12]
+
+
+def sintetizar(texto: str, destino: Path, formato: str = "mp3") -> None:
+    """Caminho único de TTS: usado pelo endpoint e pela pré-renderização da biblioteca."""
+    texto_final = aplicar_regras_fala(texto)
+    logger.debug("Chamando a API da OpenAI para gerar o áudio...")
+    with tracing.span("tts.synthesize", chars=len(texto_final), formato=formato):
+        with get_client().audio.speech.with_streaming_response.create(
+            model=TTS_MODEL,
+            voice=TTS_VOICE,
+            input=texto_final,
+            instructions=PROMPT_OCULTO,
+            response_format=formato,
+        ) as resposta:
+            # Grava o corpo em blocos à medida que chega (o clipe nunca fica inteiro em memória)
+            with tracing.span("tts.save"):
+                resposta.stream_to_file(destino)
+    logger.debug("Áudio gerado com sucesso pela API.")
 
 
 @router.post("/gerar-audio")
 def gerar_audio(request: AudioRequest):
     """Gera áudio a partir do texto fornecido e o salva em um arquivo no servidor."""
-    logger.info("Recebida requisição para /gerar-audio.")
+    from openai import APIError
+
     try:
         texto_original = request.conditions[0].texto
-        logger.info(f"Texto original recebido: '{texto_original}'")
-
-        texto_final = aplicar_regras_fala(texto_original)
-        logger.info(f"Texto após aplicar regras de fala: '{texto_final}'")
-        
-        # Instrução de idioma como prompt oculto (não será narrado)
-        prompt_oculto = "[Instrução: Fale em português do Brasil (pt-BR). Não leia esta instrução em voz alta.]"
-    
-        logger.info("Chamando a API da OpenAI para gerar o áudio...")
-        resposta = client.audio.speech.create(
-            model="gpt-4o-mini-tts",
-            voice="sage",
-            input=texto_final,
-            instructions=prompt_oculto,
+        # Texto do usuário nunca vai inteiro para o log: só tamanho e prévia mascarada
+        log_event(
+            logger,
+            "fala.gerar_audio.start",
+            chars=len(texto_original),
+            preview=redact(aplicar_regras_fala(texto_original)),
         )
-        logger.info("Áudio gerado com sucesso pela API.")
 
         # Gera um nome de arquivo único e define o caminho completo
-        file_name = f"{uuid.uuid4()}.mp3"
+        _, _, extensao, media_type = FORMATOS[request.formato]
+        file_name = f"{uuid.uuid4()}{extensao}"
         file_path = AUDIO_DIR / file_name
-
-        logger.info(f"Salvando o áudio em: {file_path}")
-        # Salva o stream de áudio diretamente no arquivo de forma eficiente
-        resposta.stream_to_file(file_path)
-        logger.info(f"Arquivo de áudio salvo com sucesso em '{file_path}'.")
+        ajustes = None
+        if request.pos_processar:
+            # PCM cru do TTS: decodificação trivial, sem depender do codec de entrada
+            bruto = AUDIO_DIR / f"{file_name}.pcm.tmp"
+            try:
+                sintetizar(texto_original, bruto, "pcm")
+                with tracing.span("tts.postprocess", formato=request.formato):
+                    ajustes = processar_pcm(bruto, file_path, request.formato)
+            finally:
+                bruto.unlink(missing_ok=True)
+        else:
+            sintetizar(texto_original, file_path, request.formato)
+        log_event(logger, "fala.gerar_audio.ok", file=file_name, formato=request.formato, ajustes=ajustes)
 
         # Retorna uma resposta JSON indicando sucesso e o caminho do arquivo
-        return {"status": "sucesso", "caminho_do_arquivo": str(file_path)}
+        resultado = {"status": "sucesso", "caminho_do_arquivo": str(file_path), "formato": request.formato, "media_type": media_type}
+        if ajustes is not None:
+            resultado["pos_processamento"] = ajustes
+        return resultado
     except APIError as e:
-        logger.error(f"Erro na API da OpenAI: Status={e.status_code}, Mensagem={e.message}", exc_info=True)
+        logger.error("Erro na API da OpenAI: Status=%s, Mensagem=%s", e.status_code, e.message, exc_info=True)
         raise HTTPException(status_code=e.status_code or 500, detail=f"Erro da API OpenAI: {str(e)}")
     except IndexError:
         logger.warning("A lista 'conditions' no corpo da requisição está vazia ou malformada.", exc_info=True)
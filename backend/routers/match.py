@@ -0,0 +1,78 @@
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+
+import tracing
+from job_index import job_index
+from matching import job_matrix, compatibilidade, explicar, profile_text
+
+router = APIRouter(prefix="/match", tags=["Compatibilidade"])
+
+
+class Perfil(BaseModel):
+    """Campos do formulário de Cadastro (`cad_cargo`, `cad_exp`, `cad_acess`)."""
+    cargo: str = ""
+    experiencia: str = ""
+    acessibilidade: list[str] = []
+
+    def as_query(self) -> dict:
+        return {"texto": profile_text(self.cargo, self.experiencia), "acessibilidade": self.acessibilidade}
+
+
+class MatchRequest(BaseModel):
+    perfil: Perfil
+    k: int = Field(10, ge=1, le=100)
+
+
+class MatchLoteRequest(BaseModel):
+    perfis: list[Perfil] = Field(..., min_length=1, max_length=256)
+    k: int = Field(10, ge=1, le=100)
+
+
+class PontuarRequest(BaseModel):
+    perfil: Perfil
+    ids: list[str] = Field(..., max_length=200)
+
+
+def _itens(query: dict, ranked: list[tuple[str, float]]) -> list[dict]:
+    # O ranking vem do último snapshot sincronizado: vaga removida depois dele some aqui
+    return [item for jid, score in ranked if (item := _item(query, jid, score))["vaga"]]
+
+
+def _item(query: dict, job_id: str, score: float) -> dict:
+    vaga = job_index.get(job_id)
+    return {
+        "vaga": vaga,
+        "score": round(score, 4),
+        "compatibilidade": compatibilidade(score),
+        "explicacao": explicar(query, vaga) if vaga else "",
+    }
+
+
+@router.post("/vagas")
+def recomendar(request: MatchRequest):
+    """Top-k vagas para um perfil (ranking vetorizado sobre o catálogo inteiro)."""
+    query = request.perfil.as_query()
+    with tracing.span("match.rank", k=request.k):
+        ranked = job_matrix.rank([query], k=request.k)[0]
+    return {"items": _itens(query, ranked)}
+
+
+@router.post("/lote")
+def recomendar_lote(request: MatchLoteRequest):
+    """Top-k para vários perfis numa única multiplicação de matrizes."""
+    queries = [p.as_query() for p in request.perfis]
+    with tracing.span("match.rank_batch", perfis=len(queries), k=request.k):
+        ranked = job_matrix.rank(queries, k=request.k)
+    return {"resultados": [_itens(q, r) for q, r in zip(queries, ranked)]}
+
+
+@router.post("/pontuar")
+def pontuar(request: PontuarRequest):
+    """Compatibilidade de vagas específicas (ex.: a página de resultados da busca)."""
+    query = request.perfil.as_query()
+    with tracing.span("match.score_ids", ids=len(request.ids)):
+        scores = job_matrix.score_ids(query, request.ids)
+    return {
+        jid: {"compatibilidade": compatibilidade(s), "explicacao": explicar(query, job_index.get(jid))}
+        for jid, s in scores.items() if job_index.get(jid)
+    }
@@ -2,46 +2,89 @@
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, HttpUrl
-# --- 1. Importe a versão assíncrona ---
-from playwright.async_api import async_playwright
 from pathlib import Path
+import asyncio
 import uuid
 import logging
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+import tracing
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/screenshot", tags=["Screenshot"])
 
+# O diretório é criado no lifespan do app (não no import)
 SCREENSHOT_DIR = Path("screenshots_gerados")
-SCREENSHOT_DIR.mkdir(exist_ok=True)
 
 class ScreenshotRequest(BaseModel):
     url: HttpUrl
 
+
+class BrowserPool:
+    """Mantém um único Chromium aberto; cada screenshot usa um contexto isolado.
+
+    O Playwright só é importado no primeiro `get()` — normalmente no aquecimento
+    disparado pelo lifespan, fora do caminho da primeira requisição.
+    """
+
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def warm(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def get(self):
+        if self.warm:
+            return self._browser
+        async with self._lock:
+            if not self.warm:
+                from playwright.async_api import async_playwright
+
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                logger.info("Navegador Chromium iniciado em modo headless.")
+        return self._browser
+
+    async def close(self):
+        async with self._lock:
+            if self._browser is not None:
+                await self._browser.close()
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+browser_pool = BrowserPool()
+
 # A função já era 'async', agora o conteúdo dela também será.
 async def take_screenshot_async(url: str) -> str:
     """Função assíncrona usando a API Async do Playwright."""
-    logger.info(f"Iniciando Playwright async para {url} ...")
+    logger.debug("Iniciando screenshot para %s ...", url)
     try:
-        # --- 2. Use 'async with' e 'async_playwright' ---
-        async with async_playwright() as p:
-            logger.info("Playwright async iniciado com sucesso.")
-            # --- 3. Use 'await' para cada operação I/O (rede, processo, etc) ---
-            browser = await p.chromium.launch(headless=True)
-            logger.info("Navegador Chromium iniciado em modo headless.")
-            page = await browser.new_page()
-            logger.info(f"Navegando para {url} ...")
-            await page.goto(url, wait_until="networkidle", timeout=60000)
-            
+        # Reaproveita o Chromium já aberto; o contexto isola cookies/cache por requisição
+        with tracing.span("screenshot.browser", warm=browser_pool.warm):
+            browser = await browser_pool.get()
+            context = await browser.new_context()
+        try:
+            page = await context.new_page()
+            logger.debug("Navegando para %s ...", url)
+            with tracing.span("screenshot.navigate"):
+                await page.goto(url, wait_until="networkidle", timeout=60000)
+
             file_name = f"{uuid.uuid4()}.png"
             file_path = SCREENSHOT_DIR / file_name
-            
-            logger.info(f"Tirando screenshot e salvando em {file_path} ...")
-            await page.screenshot(path=str(file_path), full_page=True)
-            await browser.close()
-            logger.info("Navegador fechado com sucesso.")
+
+            logger.debug("Tirando screenshot e salvando em %s ...", file_path)
+            with tracing.span("screenshot.capture"):
+                await page.screenshot(path=str(file_path), full_page=True)
             return str(file_name)
+        finally:
+            await context.close()
     except Exception as e:
         logger.exception("Erro no take_screenshot_async")
         # O traceback original do Playwright é mais útil aqui
@@ -50,15 +93,15 @@ async def take_screenshot_async(url: str) -> str:
 # Este endpoint é síncrono e não é usado pelo agente, mas vamos deixar como está
 @router.post("/tirar-print")
 async def tirar_print(request: ScreenshotRequest):
-    logger.info(f"Recebida requisição para tirar print da URL: {request.url}")
+    logger.info("Recebida requisição para tirar print da URL: %s", request.url)
     try:
         # Agora este endpoint também precisa ser async para poder usar 'await'
         file_path = await take_screenshot_async(str(request.url))
-        logger.info(f"Screenshot salvo com sucesso em {file_path}.")
+        logger.info("Screenshot salvo com sucesso em %s.", file_path)
         return {"status": "sucesso", "caminho_do_arquivo": file_path}
     except HTTPException as http_exc:
-        logger.error(f"Erro HTTP ao tirar print: {http_exc.detail}")
+        logger.error("Erro HTTP ao tirar print: %s", http_exc.detail)
         raise http_exc
     except Exception as e:
-        logger.error(f"Erro inesperado ao tirar print: {e}", exc_info=True)
+        logger.error("Erro inesperado ao tirar print: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Erro inesperado: {str(e)}")
\ No newline at end of file
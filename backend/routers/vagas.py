@@ -0,0 +1,96 @@
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+import json
+import logging
+import os
+from pathlib import Path
+
+import tracing
+from job_index import job_index, synthetic_jobs, SINGLE_FACETS, ACESSIBILIDADE
+from log_config import log_event
+from matching import job_matrix
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/vagas", tags=["Vagas"])
+
+# Catálogo inicial: arquivo JSON (lista de vagas) ou, na falta dele, vagas sintéticas de demonstração
+VAGAS_SEED_FILE = Path(os.getenv("VAGAS_SEED_FILE", "data/vagas.json"))
+VAGAS_SEED_SYNTHETIC = int(os.getenv("VAGAS_SEED_SYNTHETIC", "200"))
+
+
+class Vaga(BaseModel):
+    id: str = Field(..., min_length=1, max_length=64)
+    titulo: str
+    empresa: str = ""
+    descricao: str = ""
+    area: str | None = None
+    nivel: str | None = None
+    modelo: str | None = None
+    local: str | None = None
+    acessibilidade: list[str] = []
+    selo_inclusivo: bool = False
+
+
+def carregar_catalogo() -> int:
+    """Popula o índice no startup (chamado no lifespan do app)."""
+    if VAGAS_SEED_FILE.exists():
+        with open(VAGAS_SEED_FILE, "r", encoding="utf-8") as f:
+            vagas = [Vaga(**v).model_dump() for v in json.load(f)]
+        count = job_index.add_many(vagas)
+    else:
+        count = job_index.add_many(synthetic_jobs(VAGAS_SEED_SYNTHETIC))
+    log_event(logger, "vagas.catalogo_carregado", vagas=count)
+    return count
+
+
+@router.get("/facetas")
+async def facetas():
+    """Valores aceitos em cada filtro (usados pelos selects da página Vagas)."""
+    return {**SINGLE_FACETS, "acessibilidade": ACESSIBILIDADE}
+
+
+@router.get("/buscar")
+async def buscar(
+    q: str = "",
+    area: list[str] | None = Query(None),
+    nivel: list[str] | None = Query(None),
+    modelo: list[str] | None = Query(None),
+    local: list[str] | None = Query(None),
+    acessibilidade: list[str] | None = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+):
+    with tracing.span("vagas.search"):
+        return job_index.search(
+            q=q, page=page, page_size=page_size,
+            area=area, nivel=nivel, modelo=modelo, local=local, acessibilidade=acessibilidade,
+        )
+
+
+@router.post("")
+async def ingerir(vagas: list[Vaga]):
+    """Ingestão incremental: vagas com `id` já existente são substituídas."""
+    with tracing.span("vagas.ingest", count=len(vagas)):
+        for vaga in vagas:
+            job_index.add(vaga.model_dump())
+    # Embedar fica com a thread de sync; /match usa o snapshot anterior até lá
+    job_matrix.request_sync()
+    log_event(logger, "vagas.ingest", count=len(vagas), total=len(job_index))
+    return {"status": "sucesso", "indexadas": len(vagas), "total": len(job_index)}
+
+
+@router.get("/{vaga_id}")
+async def obter(vaga_id: str):
+    vaga = job_index.get(vaga_id)
+    if vaga is None:
+        raise HTTPException(status_code=404, detail="Vaga não encontrada.")
+    return vaga
+
+
+@router.delete("/{vaga_id}")
+async def remover(vaga_id: str):
+    if not job_index.remove(vaga_id):
+        raise HTTPException(status_code=404, detail="Vaga não encontrada.")
+    job_matrix.request_sync()
+    return {"status": "sucesso"}
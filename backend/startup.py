@@ -0,0 +1,64 @@
+"""Perfil de inicialização e checagens de prontidão (readiness) do backend.
+
+`/health` responde só se o processo está vivo; `/ready` agrega os checks
+registrados aqui pelos subsistemas (navegador, cliente OpenAI, caches...).
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+# Marco zero: primeiro import deste módulo (app.py importa logo no topo)
+_T0 = time.perf_counter()
+
+_phases: list[dict] = []
+_checks: dict[str, Callable[[], bool]] = {}
+_started_ms: int | None = None
+
+
+def _elapsed_ms() -> int:
+    return int((time.perf_counter() - _T0) * 1000)
+
+
+@contextmanager
+def phase(name: str):
+    """Mede uma fase de import/startup e guarda no relatório."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append({
+            "phase": name,
+            "at_ms": _elapsed_ms(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+
+
+def mark_started() -> None:
+    """Chamado no fim do lifespan, quando o servidor começa a aceitar requisições."""
+    global _started_ms
+    _started_ms = _elapsed_ms()
+
+
+def register_check(name: str, check: Callable[[], bool]) -> None:
+    """Registra um check de prontidão. Deve ser barato: roda a cada `/ready`."""
+    _checks[name] = check
+
+
+def readiness() -> dict:
+    results: dict[str, bool] = {}
+    for name, check in _checks.items():
+        try:
+            results[name] = bool(check())
+        except Exception:
+            results[name] = False
+    return {"ready": _started_ms is not None and all(results.values()), "checks": results}
+
+
+def report() -> dict:
+    return {
+        "started_ms": _started_ms,
+        "uptime_ms": _elapsed_ms(),
+        "phases": list(_phases),
+        "readiness": readiness(),
+    }
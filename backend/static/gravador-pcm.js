@@ -0,0 +1,35 @@
+// AudioWorklet: reduz o microfone para PCM 16 kHz int16 mono e entrega blocos
+// de ~0,5 s à página (a análise de fala roda no backend, ver analise_fala.py).
+class GravadorPcm extends AudioWorkletProcessor {
+  constructor() {
+    super();
+    this.passo = sampleRate / 16000;
+    this.pos = 0;
+    this.buf = new Int16Array(8000);
+    this.n = 0;
+  }
+
+  process(inputs) {
+    const canal = inputs[0] && inputs[0][0];
+    if (!canal) return true;
+    // Decimação por média dos quadros de entrada de cada amostra de saída
+    while (this.pos < canal.length) {
+      const ini = Math.floor(this.pos);
+      const fim = Math.min(canal.length, Math.max(ini + 1, Math.floor(this.pos + this.passo)));
+      let soma = 0;
+      for (let i = ini; i < fim; i++) soma += canal[i];
+      const v = Math.max(-1, Math.min(1, soma / (fim - ini)));
+      this.buf[this.n++] = v < 0 ? v * 0x8000 : v * 0x7fff;
+      if (this.n === this.buf.length) {
+        this.port.postMessage(this.buf.buffer, [this.buf.buffer]);
+        this.buf = new Int16Array(8000);
+        this.n = 0;
+      }
+      this.pos += this.passo;
+    }
+    this.pos -= canal.length;
+    return true;
+  }
+}
+
+registerProcessor('gravador-pcm', GravadorPcm);
@@ -3,15 +3,22 @@
   const audioEl = document.getElementById('remoteAudio');
   const transcriptsEl = document.getElementById('transcripts');
   const CLIENT_ID = window.FAROL_CLIENT_ID || 'unknown';
+  const SESSION_KEY = 'farol.session.' + CLIENT_ID;
+  const LOADED_KEY = 'farol.loaded.' + CLIENT_ID;
+  // Recarga do iframe com o mesmo client_id (rerun/troca de página no Streamlit)
+  let IS_RELOAD = false;
+  try { IS_RELOAD = !!sessionStorage.getItem(LOADED_KEY); sessionStorage.setItem(LOADED_KEY, '1'); } catch (_) {}
 
   function setStatus(text) { if (statusEl) statusEl.textContent = text; }
-  async function postLog(type, message, data) {
+  // Fire-and-forget: nunca fica no caminho crítico da chamada
+  function postLog(type, message, data) {
     try {
-      await fetch('/logs', {
+      fetch('/logs', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        keepalive: true,
+        headers: { 'Content-Type': 'application/json', 'X-Client-ID': CLIENT_ID },
         body: JSON.stringify({ client_id: CLIENT_ID, type, message, data })
-      });
+      }).catch(() => { /* ignore */ });
     } catch (_) { /* ignore */ }
   }
   function appendTranscript(prefix, text) {
@@ -79,48 +86,198 @@
     } catch (e) { /* ignore */ }
   }
 
-  function waitForIceGatheringComplete(pc) {
-    if (pc.iceGatheringState === 'complete') return Promise.resolve();
+  // Envia o áudio do candidato ao backend em blocos de ~2 s (PCM 16 kHz) durante a
+  // chamada; as métricas são calculadas incrementalmente, então finalizar é imediato.
+  // Só enquanto o candidato está na página Entrevista (o widget continua aberto nas
+  // outras): cada passagem pela página é uma `sessao` de análise própria.
+  async function startInterviewAnalytics(stream) {
+    const base = '/analise/' + encodeURIComponent(CLIENT_ID);
+    let sessao = null; let seq = 0; let pendentes = []; let amostras = 0;
+    let fila = Promise.resolve(); let encerrada = false; let consultando = false;
+
+    function abrirSessao() {
+      sessao = (crypto.randomUUID && crypto.randomUUID()) || String(Date.now());
+      seq = 0; pendentes = []; amostras = 0;
+      postLog('analytics', 'started', { sessao });
+    }
+
+    function fecharSessao(final) {
+      if (!sessao) return;
+      const atual = sessao;
+      sessao = null; pendentes = []; amostras = 0;
+      // Na fila: só depois do último bloco. Se a aba fechar antes de a fila andar,
+      // o backend finaliza a sessão sozinho após ANALISE_IDLE_S
+      fila = fila.then(() => fetch(base + '/finalizar?sessao=' + atual, { method: 'POST', keepalive: final })).catch(() => {});
+    }
+
+    function enviar(final) {
+      if (!amostras || !sessao) return;
+      const bloco = new Int16Array(amostras); let off = 0;
+      for (const p of pendentes) { bloco.set(p, off); off += p.length; }
+      pendentes = []; amostras = 0;
+      const atual = sessao;
+      const url = base + '/audio?sessao=' + atual + '&seq=' + (seq++);
+      const opts = {
+        method: 'POST', body: bloco.buffer, keepalive: final,
+        headers: { 'Content-Type': 'application/octet-stream', 'X-Client-ID': CLIENT_ID },
+      };
+      // Encadeado para chegar em ordem (o backend responde 409 a blocos fora de ordem)
+      fila = fila.then(() => fetch(url, opts))
+        .then((r) => (r.ok ? r.json() : null))
+        // Saiu da página (entrevista: false) ou o backend já fechou a sessão (proximo: -1)
+        .then((j) => { if (j && (j.entrevista === false || j.proximo === -1) && sessao === atual) fecharSessao(false); })
+        .catch(() => {});
+    }
+
+    // Fora da página Entrevista nenhum áudio é enviado; só o modo é consultado
+    async function consultarModo() {
+      if (encerrada || sessao || consultando) return;
+      consultando = true;
+      try {
+        const r = await fetch(base + '/modo');
+        if (r.ok && (await r.json()).entrevista && !encerrada && !sessao) abrirSessao();
+      } catch (_) { /* ignore */ }
+      consultando = false;
+    }
+
+    function encerrar() {
+      if (encerrada) return;
+      encerrada = true;
+      enviar(true);
+      fecharSessao(true);
+    }
+
+    try {
+      const ctx = new (window.AudioContext || window.webkitAudioContext)();
+      await ctx.audioWorklet.addModule('/static/gravador-pcm.js');
+      const node = new AudioWorkletNode(ctx, 'gravador-pcm');
+      node.port.onmessage = (ev) => {
+        if (encerrada || !sessao) return;
+        const parte = new Int16Array(ev.data);
+        pendentes.push(parte); amostras += parte.length;
+        if (amostras >= 32000) enviar(false);
+      };
+      ctx.createMediaStreamSource(stream).connect(node);
+      // Saída muda até o destino: alguns navegadores só processam nós ligados ao grafo final
+      const mudo = ctx.createGain(); mudo.gain.value = 0;
+      node.connect(mudo).connect(ctx.destination);
+      window.addEventListener('pagehide', encerrar);
+      for (const track of stream.getAudioTracks()) track.addEventListener('ended', encerrar);
+      consultarModo();
+      setInterval(consultarModo, 2000);
+    } catch (e) {
+      postLog('analytics', 'unavailable', { message: e && e.message ? e.message : String(e) });
+    }
+    return encerrar;
+  }
+
+  // Comandos de menu ("abrir vagas", "aumentar a fonte") são resolvidos pelo roteador
+  // local do backend; o modelo só responde quando o pedido é conversa (llm: true).
+  function routeVoiceCommand(text, dc) {
+    fetch('/comandos/interpretar', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'X-Client-ID': CLIENT_ID },
+      body: JSON.stringify({ texto: String(text).slice(0, 500), client_id: CLIENT_ID }),
+    }).then((r) => r.json()).then((res) => {
+      if (!res || res.llm) return;
+      try { dc.send(JSON.stringify({ type: 'response.cancel' })); } catch (_) {}
+      const labels = { navegar: 'Abrindo ' + res.pagina + '…', buscar_vagas: 'Buscando vagas…', acessibilidade: 'Ajustando a interface…' };
+      setStatus(labels[res.intencao] || 'Comando recebido.');
+      postLog('voice_command', res.intencao, { ms: res.ms });
+    }).catch(() => {});
+  }
+
+  // Espera adaptativa: envia assim que houver um conjunto de candidatos utilizável
+  // (srflx/relay quando há servidores ICE; host quando não há), com teto configurável.
+  function waitForUsableCandidates(pc, { maxWaitMs, settleMs, wantReflexive }) {
+    if (pc.iceGatheringState === 'complete') return Promise.resolve('complete');
     return new Promise((resolve) => {
-      function check() {
-        if (pc.iceGatheringState === 'complete') {
-          pc.removeEventListener('icegatheringstatechange', check);
-          resolve();
-        }
+      let settleTimer = null;
+      let done = false;
+      function finish(reason) {
+        if (done) return;
+        done = true;
+        clearTimeout(settleTimer); clearTimeout(maxTimer);
+        pc.removeEventListener('icecandidate', onCandidate);
+        pc.removeEventListener('icegatheringstatechange', onState);
+        resolve(reason);
+      }
+      function onCandidate(ev) {
+        if (!ev.candidate) return finish('complete');
+        const type = ev.candidate.type || (/ typ (\w+)/.exec(ev.candidate.candidate) || [])[1];
+        const usable = wantReflexive ? (type === 'srflx' || type === 'relay') : !!type;
+        if (usable && !settleTimer) settleTimer = setTimeout(() => finish('usable'), settleMs);
       }
-      pc.addEventListener('icegatheringstatechange', check);
-      setTimeout(() => { pc.removeEventListener('icegatheringstatechange', check); resolve(); }, 2500);
+      function onState() { if (pc.iceGatheringState === 'complete') finish('complete'); }
+      pc.addEventListener('icecandidate', onCandidate);
+      pc.addEventListener('icegatheringstatechange', onState);
+      const maxTimer = setTimeout(() => finish('timeout'), maxWaitMs);
+    });
+  }
+
+  // Reaproveita o token efêmero enquanto ainda válido (margem de 10 s para o SDP)
+  function loadCachedSession() {
+    try {
+      const cached = JSON.parse(sessionStorage.getItem(SESSION_KEY) || 'null');
+      if (cached && cached.token && cached.expires_at * 1000 - Date.now() > 10000) return cached.token;
+    } catch (_) { /* ignore */ }
+    return null;
+  }
+
+  async function getSessionToken(forceFresh) {
+    if (!forceFresh) {
+      const cachedToken = loadCachedSession();
+      if (cachedToken) return { token: cachedToken, resumed: true };
+    }
+    const headers = { 'X-Client-ID': CLIENT_ID };
+    // O backend também guarda o token por client_id: sem o cabeçalho devolveria o mesmo token recusado
+    if (forceFresh) headers['X-Session-Fresh'] = '1';
+    const sessResp = await fetch('/session', { method: 'POST', headers });
+    if (!sessResp.ok) {
+      const t = await sessResp.text();
+      postLog('session_error', 'failed_create_session', { status: sessResp.status, body: t.substring(0, 500) });
+      throw new Error('Falha ao criar sessão: ' + t);
+    }
+    const session = await sessResp.json();
+    const secret = session && session.client_secret;
+    const token = (secret && (secret.value || secret)) || null;
+    if (!token) throw new Error('Token efêmero ausente na resposta do backend.');
+    try {
+      if (secret && secret.expires_at) sessionStorage.setItem(SESSION_KEY, JSON.stringify({ token, expires_at: secret.expires_at }));
+    } catch (_) { /* ignore */ }
+    return { token, resumed: sessResp.headers.get('X-Session-Resumed') === '1' };
+  }
+
+  function postOffer(token, sdp) {
+    return fetch('https://api.openai.com/v1/realtime?model=' + encodeURIComponent(window.FAROL_MODEL || 'gpt-realtime-2025-08-28'), {
+      method: 'POST',
+      headers: {
+        'Authorization': 'Bearer ' + token,
+        'Content-Type': 'application/sdp',
+        'Accept': 'application/sdp',
+        'OpenAI-Beta': 'realtime=v1'
+      },
+      body: sdp
     });
   }
 
   async function main() {
+    // Marcas por fase (ms desde o início da navegação do iframe), enviadas ao backend
+    const timings = {};
+    const mark = (name) => { timings[name] = Math.round(performance.now()); };
+    mark('start');
     try {
       setStatus('Aguardando permissão do microfone…');
-      await postLog('page_load', 'loaded');
-      const mic = await navigator.mediaDevices.getUserMedia({ audio: true });
-      await postLog('mic', 'granted');
-      audioEl.muted = true; // Avoid feedback if any local playback
-      // Prime autoplay right after getUserMedia for stricter browsers
-      await ensureAudioPlayback(true);
-      setStatus('Microfone ativo. Criando sessão…');
+      postLog('page_load', 'loaded');
 
-      setupLocalSpeakingDetector(mic);
+      // 1) Em paralelo: token da sessão, permissão do microfone e negociação local
+      const sessionPromise = getSessionToken(false).then((s) => { mark('session'); return s; });
+      sessionPromise.catch(() => {}); // erro tratado no await abaixo
+      const micPromise = navigator.mediaDevices.getUserMedia({ audio: true }).then((m) => { mark('mic'); return m; });
+      micPromise.catch(() => {});
 
-      const sessResp = await fetch('/session', { method: 'POST' });
-      if (!sessResp.ok) {
-        const t = await sessResp.text();
-        await postLog('session_error', 'failed_create_session', { status: sessResp.status, body: t.substring(0, 500) });
-        throw new Error('Falha ao criar sessão: ' + t);
-      }
-      const session = await sessResp.json();
-      const token = (session && session.client_secret && (session.client_secret.value || session.client_secret)) || null;
-      if (!token) throw new Error('Token efêmero ausente na resposta do backend.');
-      await postLog('session_ok', 'created', { has_token: !!token });
-
-      const pc = new RTCPeerConnection({
-        bundlePolicy: 'max-bundle', rtcpMuxPolicy: 'require',
-        iceServers: [{ urls: 'stun:stun.l.google.com:19302' }]
-      });
+      const iceServers = Array.isArray(window.FAROL_ICE_SERVERS) ? window.FAROL_ICE_SERVERS : [];
+      const pc = new RTCPeerConnection({ bundlePolicy: 'max-bundle', rtcpMuxPolicy: 'require', iceServers });
 
       // Optional DataChannel for logs/events
       const dc = pc.createDataChannel('oai-events');
@@ -130,6 +287,13 @@
           const msg = JSON.parse(ev.data);
           // Heuristics for transcripts and assistant messages
           const type = msg.type || '';
+          if (!timings.first_response && type.startsWith('response.')) {
+            mark('first_response');
+            postLog('call_timing', 'first_response', { phases: { first_response: timings.first_response } });
+          }
+          if (type === 'conversation.item.input_audio_transcription.completed' && msg.transcript) {
+            routeVoiceCommand(msg.transcript, dc);
+          }
           if (/transcript|input|user/.test(type)) {
             const t = msg.text || msg.transcript || msg.content || msg.delta || JSON.stringify(msg);
             if (t) { appendTranscript('Você', String(t)); postLog('transcript_user', 'recv', { t: String(t).slice(0, 500) }); }
@@ -146,8 +310,8 @@
 
       // Remote audio
       const remoteStream = new MediaStream();
-      audioEl.srcObject = remoteStream;
       pc.ontrack = (event) => {
+        if (!timings.remote_track) mark('remote_track');
         for (const track of event.streams[0].getTracks()) remoteStream.addTrack(track);
         // Switch from primed silent stream to the remote stream
         try { audioEl.srcObject = remoteStream; } catch (_) {}
@@ -159,43 +323,65 @@
       pc.onconnectionstatechange = () => { setStatus('Estado de conexão: ' + pc.connectionState); postLog('pc', 'state', { state: pc.connectionState }); };
       pc.oniceconnectionstatechange = () => { console.log('[Farol] ICE:', pc.iceConnectionState); postLog('ice', 'state', { state: pc.iceConnectionState }); };
 
-      // Receive audio from model
-      try { pc.addTransceiver('audio', { direction: 'recvonly' }); } catch {}
-      // Send mic
-      mic.getTracks().forEach(t => pc.addTrack(t, mic));
-
-      const offer = await pc.createOffer({ offerToReceiveAudio: true });
-      await postLog('rtc', 'offer_created');
+      // Um único transceiver de áudio (envia mic, recebe o modelo): a oferta e a
+      // coleta ICE não precisam esperar a permissão; a faixa entra via replaceTrack.
+      const audioTx = pc.addTransceiver('audio', { direction: 'sendrecv' });
+      const offer = await pc.createOffer();
       await pc.setLocalDescription(offer);
-      await postLog('rtc', 'local_description_set');
-      await waitForIceGatheringComplete(pc);
+      mark('offer');
+      const icePromise = waitForUsableCandidates(pc, {
+        maxWaitMs: Number(window.FAROL_ICE_MAX_WAIT_MS) || 800,
+        settleMs: 50,
+        wantReflexive: iceServers.length > 0,
+      }).then((reason) => { mark('ice'); timings.ice_reason = reason; });
 
-      setStatus('Conectando ao modelo…');
-      const sdpResp = await fetch('https://api.openai.com/v1/realtime?model=' + encodeURIComponent(window.FAROL_MODEL || 'gpt-realtime-2025-08-28'), {
-        method: 'POST',
-        headers: {
-          'Authorization': 'Bearer ' + token,
-          'Content-Type': 'application/sdp',
-          'Accept': 'application/sdp',
-          'OpenAI-Beta': 'realtime=v1'
-        },
-        body: offer.sdp
-      });
+      const mic = await micPromise;
+      audioEl.muted = true; // Avoid feedback if any local playback
+      // Prime autoplay right after getUserMedia for stricter browsers
+      ensureAudioPlayback(true);
+      setStatus('Microfone ativo. Conectando ao modelo…');
+      setupLocalSpeakingDetector(mic);
+      const [micTrack] = mic.getAudioTracks();
+      await audioTx.sender.replaceTrack(micTrack);
+      audioTx.sender.setStreams && audioTx.sender.setStreams(mic);
+
+      const [{ token, resumed }] = await Promise.all([sessionPromise, icePromise]);
+      postLog('session_ok', resumed ? 'resumed' : 'created', { has_token: !!token, resumed });
+
+      // 2) SDP com os candidatos já coletados (localDescription, não a oferta crua)
+      const sdp = pc.localDescription.sdp;
+      let sdpResp = await postOffer(token, sdp);
+      if (!sdpResp.ok && resumed) {
+        // Token retomado foi recusado: descarta e cria uma sessão nova uma única vez
+        try { sessionStorage.removeItem(SESSION_KEY); } catch (_) {}
+        const fresh = await getSessionToken(true);
+        sdpResp = await postOffer(fresh.token, sdp);
+      }
       if (!sdpResp.ok) {
         const t = await sdpResp.text();
-        await postLog('sdp_error', 'answer_failed', { status: sdpResp.status, body: t.substring(0, 500) });
+        postLog('sdp_error', 'answer_failed', { status: sdpResp.status, body: t.substring(0, 500) });
         throw new Error('Falha SDP: ' + t);
       }
       const answer = await sdpResp.text();
+      mark('sdp');
       await pc.setRemoteDescription({ type: 'answer', sdp: answer });
+      mark('connected');
       setStatus('Conectado. Fale comigo.');
-      await postLog('connected', 'rtc_established');
+      postLog('call_timing', 'connected', { phases: timings, resumed });
+      // Tempo desde o início da navegação do iframe até o áudio conectado
+      postLog(IS_RELOAD ? 'reconnect' : 'connect', 'timing', { ms: timings.connected, resumed });
+
+      startInterviewAnalytics(mic).then((encerrarAnalise) => {
+        pc.addEventListener('connectionstatechange', () => {
+          if (pc.connectionState === 'failed' || pc.connectionState === 'closed') encerrarAnalise();
+        });
+      });
 
       window.addEventListener('beforeunload', () => pc.close());
     } catch (err) {
       console.error(err);
       setStatus('Erro: ' + (err && err.message ? err.message : String(err)));
-      await postLog('error', 'exception', { message: err && err.message ? err.message : String(err) });
+      postLog('error', 'exception', { message: err && err.message ? err.message : String(err), phases: timings });
     }
   }
 
@@ -0,0 +1,209 @@
+"""Tracing leve em processo: spans por requisição, exportação NDJSON e Server-Timing.
+
+Cada requisição HTTP abre um `Trace` (middleware em app.py) guardado num
+ContextVar; `span()` mede trechos dentro dele. Como o Starlette copia o
+contexto para o threadpool, rotas síncronas (`/fala`, `/descrever`) também
+enxergam o trace corrente. Traces finalizados ficam numa janela em memória
+(`slowest()`) e são gravados em NDJSON por uma thread própria; tarefas que
+sobrevivem à requisição (`asyncio.create_task` copia o contexto) não alteram
+mais um trace já finalizado.
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.ndjson")
+TRACE_BUFFER = int(os.getenv("TRACE_BUFFER", "500"))
+# Rotação por tamanho: `traces.ndjson` -> `.1` ... `.TRACE_BACKUPS` (o mais antigo é apagado)
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(50 * 1024 * 1024)))
+TRACE_BACKUPS = int(os.getenv("TRACE_BACKUPS", "3"))
+# Rotas de alta frequência (polling, blocos de áudio, logs do cliente): só 1 a cada
+# TRACE_SAMPLE_EVERY entra na janela/arquivo, além das lentas ou com erro
+TRACE_SAMPLE_EVERY = int(os.getenv("TRACE_SAMPLE_EVERY", "100"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "250"))
+_AMOSTRADAS = re.compile(
+    r"^(?:GET /comandos/[^/]+/pendente|POST /analise/[^/]+/audio|GET /analise/[^/]+/modo|POST /logs|GET /health|GET /ready)$"
+)
+
+
+class Trace:
+    __slots__ = ("request_id", "client_id", "name", "started", "duration_ms", "spans", "attrs")
+
+    def __init__(self, name: str, request_id: str | None = None, client_id: str | None = None):
+        self.request_id = request_id or str(uuid.uuid4())
+        self.client_id = client_id
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration_ms: float | None = None
+        self.spans: list[dict] = []
+        self.attrs: dict = {}
+
+    def to_dict(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "client_id": self.client_id,
+            "name": self.name,
+            "duration_ms": self.duration_ms,
+            # Cópias: o documento vai para `_recent` e para a thread de exportação
+            "spans": list(self.spans),
+            **({"attrs": dict(self.attrs)} if self.attrs else {}),
+        }
+
+    def server_timing(self) -> str:
+        """Cabeçalho `Server-Timing` (nomes de span sem pontos, como pede a especificação)."""
+        parts = [f'{s["name"].replace(".", "-")};dur={s["duration_ms"]}' for s in self.spans]
+        if self.duration_ms is not None:
+            parts.append(f"total;dur={self.duration_ms}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Trace | None] = ContextVar("farol_trace", default=None)
+_recent: deque = deque(maxlen=TRACE_BUFFER)
+_export_queue: queue.SimpleQueue = queue.SimpleQueue()
+_exporter: threading.Thread | None = None
+_amostragem = {"vistos": 0, "descartados": 0}
+
+
+def current() -> Trace | None:
+    return _current.get()
+
+
+def current_request_id() -> str | None:
+    trace = _current.get()
+    return trace.request_id if trace else None
+
+
+def annotate(client_id: str | None = None, **attrs) -> None:
+    """Anexa `client_id` (e atributos livres) ao trace corrente, se houver."""
+    trace = _current.get()
+    if trace is None or trace.duration_ms is not None:
+        return
+    if client_id:
+        trace.client_id = client_id
+    trace.attrs.update(attrs)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Mede um trecho do trace corrente; sem trace ativo, é um no-op barato."""
+    trace = _current.get()
+    if trace is None or trace.duration_ms is not None:
+        yield
+        return
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        record = {
+            "name": name,
+            "start_ms": round((started - trace.started) * 1000, 2),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        if attrs:
+            record["attrs"] = attrs
+        if error:
+            record["error"] = error
+        if trace.duration_ms is None:
+            trace.spans.append(record)
+
+
+def begin(name: str, request_id: str | None = None, client_id: str | None = None) -> tuple[Trace, object]:
+    trace = Trace(name, request_id=request_id, client_id=client_id)
+    return trace, _current.set(trace)
+
+
+def _registrar(trace: Trace) -> bool:
+    if not _AMOSTRADAS.match(trace.name) or trace.duration_ms >= TRACE_SLOW_MS:
+        return True
+    if any("error" in s for s in trace.spans):
+        return True
+    _amostragem["vistos"] += 1
+    if TRACE_SAMPLE_EVERY <= 1 or _amostragem["vistos"] % TRACE_SAMPLE_EVERY == 1:
+        return True
+    _amostragem["descartados"] += 1
+    return False
+
+
+def finish(trace: Trace, token) -> None:
+    trace.duration_ms = round((time.perf_counter() - trace.started) * 1000, 2)
+    _current.reset(token)
+    if not _registrar(trace):
+        return
+    doc = trace.to_dict()
+    _recent.append(doc)
+    if _exporter is not None:
+        _export_queue.put(doc)
+
+
+def amostragem() -> dict:
+    """Traces de rotas de alta frequência vistos vs. descartados pela amostragem."""
+    return dict(_amostragem)
+
+
+def slowest(limit: int = 10, name: str | None = None) -> list[dict]:
+    """Traces mais lentos da janela recente (últimos `TRACE_BUFFER`)."""
+    items = [t for t in list(_recent) if name is None or t["name"] == name]
+    return sorted(items, key=lambda t: t["duration_ms"] or 0, reverse=True)[:limit]
+
+
+def _rotate(path: str) -> None:
+    for i in range(TRACE_BACKUPS - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    if TRACE_BACKUPS > 0:
+        os.replace(path, f"{path}.1")
+    else:
+        os.remove(path)
+
+
+def _export_loop(path: str) -> None:
+    f = open(path, "a", encoding="utf-8")
+    try:
+        while True:
+            doc = _export_queue.get()
+            if doc is None:
+                return
+            f.write(json.dumps(doc, ensure_ascii=False, default=str) + "\n")
+            # Drena o que já estiver na fila antes do flush
+            while True:
+                try:
+                    doc = _export_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if doc is None:
+                    return
+                f.write(json.dumps(doc, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            if f.tell() >= TRACE_MAX_BYTES:
+                f.close()
+                _rotate(path)
+                f = open(path, "a", encoding="utf-8")
+    finally:
+        f.close()
+
+
+def start_exporter() -> None:
+    global _exporter
+    if _exporter is None and TRACE_FILE:
+        _exporter = threading.Thread(target=_export_loop, args=(TRACE_FILE,), name="trace-exporter", daemon=True)
+        _exporter.start()
+
+
+def stop_exporter() -> None:
+    global _exporter
+    if _exporter is not None:
+        _export_queue.put(None)
+        _exporter.join(timeout=2.0)
+        _exporter = None
@@ -1,11 +1,17 @@
 # streamlit_app.py — sólido, a11y-first, accent azul, sem scroll na sidebar, HTML seguro
 
-import os, textwrap
+import os, textwrap, time, uuid, json, html
+import urllib.parse, urllib.request
 from contextlib import suppress
+from functools import lru_cache
 import streamlit as st
 
+_RUN_STARTED = time.perf_counter()
+
 # ================== CONFIG ==================
 BACKEND_PUBLIC_URL = os.getenv("BACKEND_PUBLIC_URL", "http://backend:8000")
+# Chamadas feitas pelo servidor Streamlit (não pelo navegador) usam a rede interna
+BACKEND_INTERNAL_URL = os.getenv("BACKEND_INTERNAL_URL", BACKEND_PUBLIC_URL)
 st.set_page_config(page_title="Farol — Plataforma", page_icon="🧭",
                    layout="wide", initial_sidebar_state="expanded")
 
@@ -16,10 +22,18 @@ def init_state():
     st.session_state.setdefault("mode", "dark")     # dark / light
     st.session_state.setdefault("high_contrast", False)
     st.session_state.setdefault("reduce_motion", True)
+    # id estável do widget realtime: o src do iframe não muda entre reruns
+    # (o navegador mantém o iframe e a conexão) e recargas retomam a sessão
+    st.session_state.setdefault("rt_client_id", str(uuid.uuid4()))
+    # Conversa por voz aberta: o widget fica na sidebar e sobrevive à troca de página
+    st.session_state.setdefault("voz_ativa", False)
 init_state()
 
 # ================== TEMA ==================
-def inject_theme_css(zoom: float, mode: str, high_contrast: bool, reduce_motion: bool):
+# CSS gerado uma vez por combinação (zoom, mode, high_contrast, reduce_motion);
+# reruns reaproveitam a mesma string (sem reformatar ~100 linhas a cada interação)
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_theme_css(zoom: float, mode: str, high_contrast: bool, reduce_motion: bool) -> str:
     ACCENT = "#3B82F6"; ACCENT_STRONG = "#1D4ED8"
     if mode == "light":
         base = dict(bg="#FFFFFF", panel="#FFFFFF", card="#FAFAFA",
@@ -34,7 +48,7 @@ def inject_theme_css(zoom: float, mode: str, high_contrast: bool, reduce_motion:
         base["edge2"] = base["edge"]; base["accent"] = "#1E90FF"; base["accent_strong"] = "#005BBB"
     motion_css = "*,*::before,*::after{transition:none!important;animation:none!important}" if reduce_motion else ""
 
-    st.markdown(f"""
+    return f"""
     <style>
       :root {{
         --padding-card: 15px;
@@ -95,7 +109,7 @@ def inject_theme_css(zoom: float, mode: str, high_contrast: bool, reduce_motion:
       .kpi{{ background:var(--card); border:2px solid var(--edge); border-radius:var(--radius); padding:var(--gap); }}
       .kpi .lbl{{ color:var(--muted); font-weight:700; }}
       .kpi .val{{ font-size:2rem; font-weight:900; margin:.2rem 0; }}
-      .progress{{ height:14px; border-radius:999px; background:{'#111' if st.session_state.mode=='dark' else '#E5E7EB'};
+      .progress{{ height:14px; border-radius:999px; background:{'#111' if mode=='dark' else '#E5E7EB'};
                    border:2px solid var(--edge); }}
       .progress>div{{ height:100%; width:0; border-radius:999px; background:var(--accent); }}
 
@@ -114,14 +128,18 @@ def inject_theme_css(zoom: float, mode: str, high_contrast: bool, reduce_motion:
       {motion_css}
     </style>
 
-    """, unsafe_allow_html=True)
+    """
+
+def inject_theme_css(zoom: float, mode: str, high_contrast: bool, reduce_motion: bool):
+    st.markdown(build_theme_css(zoom, mode, high_contrast, reduce_motion), unsafe_allow_html=True)
 
 # ============= helpers (dedent para impedir “code block”) =============
 def _clean_html(s: str) -> str:
     return textwrap.dedent(s).strip() if s else ""
 
-def card(title, body_html: str = "", footer_html: str = "", aria_label: str | None = None):
-    html = f"""
+@lru_cache(maxsize=512)
+def _card_html(title, body_html: str, footer_html: str, aria_label: str | None) -> str:
+    return f"""
     <section class="card" role="region" aria-label="{aria_label or title}">
       <div class="content">
         <h2 style="font-size:1.25rem">{title}</h2>
@@ -129,7 +147,9 @@ def card(title, body_html: str = "", footer_html: str = "", aria_label: str | No
         {_clean_html(footer_html)}
       </div>
     </section>"""
-    st.markdown(html, unsafe_allow_html=True)
+
+def card(title, body_html: str = "", footer_html: str = "", aria_label: str | None = None):
+    st.markdown(_card_html(title, body_html, footer_html, aria_label), unsafe_allow_html=True)
 
 def kpi_chip(label, value, hint=None, percent=None):
     p_html = ""
@@ -147,18 +167,89 @@ def kpi_chip(label, value, hint=None, percent=None):
     </div>
     """, unsafe_allow_html=True)
 
-def job_card(i: int, match: int | None = None, selo: bool = False):
-    desc = "Requisitos: WAI-ARIA, acessibilidade web, testes automatizados."
-    selo_html = '<span style="background:#052; padding:.15rem .4rem; border-radius:.4rem; margin-left:.4rem;">Selo Empresa Inclusiva</span>' if selo else ""
-    match_html = f'<div style="margin-top:.4rem"><b>Compatibilidade (IA):</b> {match}% — <span style="color:var(--muted)">explicação breve do match</span></div>' if match is not None else ""
+def job_card(vaga: dict, match: int | None = None, explicacao: str = ""):
+    esc = lambda k: html.escape(str(vaga.get(k) or ""))
+    selo_html = '<span style="background:#052; padding:.15rem .4rem; border-radius:.4rem; margin-left:.4rem;">Selo Empresa Inclusiva</span>' if vaga.get("selo_inclusivo") else ""
+    match_html = f'<div style="margin-top:.4rem"><b>Compatibilidade (IA):</b> {match}% — <span style="color:var(--muted)">{html.escape(explicacao)}</span></div>' if match is not None else ""
+    acess = ", ".join(html.escape(a) for a in vaga.get("acessibilidade") or [])
     body = f"""
-    <p><b>Empresa X</b> · Remoto · <b>Pleno</b>{selo_html}</p>
-    <p>{desc}</p>
+    <p><b>{esc("empresa")}</b> · {esc("modelo")} · {esc("local")} · <b>{esc("nivel")}</b>{selo_html}</p>
+    <p>{esc("descricao")}</p>
+    {f'<p style="color:var(--muted)">Acessibilidade: {acess}</p>' if acess else ""}
     {match_html}
     """
-    card(f"Vaga #{i} — Desenvolvedor(a) Acessibilidade", body,
+    card(f"{esc('titulo')} — {esc('area')}", body,
          '<a href="#" aria-label="Candidatar-se" class="btn">Candidatar-se</a>',
-         aria_label=f"Vaga {i}")
+         aria_label=f"Vaga {esc('titulo')}")
+
+# ============= backend (chamadas server-side) =============
+def backend_get(path: str, params: dict | list | None = None, timeout: float = 5.0):
+    query = f"?{urllib.parse.urlencode(params, doseq=True)}" if params else ""
+    with urllib.request.urlopen(f"{BACKEND_INTERNAL_URL}{path}{query}", timeout=timeout) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+def backend_post(path: str, payload: dict, timeout: float = 5.0):
+    req = urllib.request.Request(f"{BACKEND_INTERNAL_URL}{path}", data=json.dumps(payload).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+def backend_upload(path: str, arquivo, nome: str, timeout: float = 60.0):
+    # O UploadedFile já está inteiro na memória do servidor Streamlit (limitado por
+    # server.maxUploadSize = CURRICULO_MAX_MB); passá-lo como corpo só evita a cópia extra do getvalue()
+    arquivo.seek(0)
+    req = urllib.request.Request(f"{BACKEND_INTERNAL_URL}{path}?{urllib.parse.urlencode({'nome': nome})}", data=arquivo,
+                                 headers={"Content-Type": "application/octet-stream", "Content-Length": str(arquivo.size)},
+                                 method="POST")
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+@st.cache_data(ttl=300, show_spinner=False)
+def vagas_facetas() -> dict:
+    return backend_get("/vagas/facetas")
+
+@st.cache_data(ttl=30, show_spinner=False)
+def buscar_vagas(q: str, area: str, nivel: str, modelo: str, acessibilidade: tuple, page: int, page_size: int = 10) -> dict:
+    params = {"q": q, "page": page, "page_size": page_size, "acessibilidade": list(acessibilidade)}
+    for nome, valor in (("area", area), ("nivel", nivel), ("modelo", modelo)):
+        if valor != TODAS:
+            params[nome] = valor
+    return backend_get("/vagas/buscar", params)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def pontuar_vagas(cargo: str, experiencia: str, acessibilidade: tuple, ids: tuple) -> dict:
+    perfil = {"cargo": cargo, "experiencia": experiencia, "acessibilidade": list(acessibilidade)}
+    return backend_post("/match/pontuar", {"perfil": perfil, "ids": list(ids)})
+
+@st.cache_data(ttl=10, show_spinner=False)
+def analise_entrevista(client_id: str) -> dict | None:
+    # Métricas da entrevista por voz (calculadas no backend durante a chamada)
+    try:
+        return backend_get(f"/analise/{client_id}")
+    except Exception:
+        return None
+
+def tempo_relativo(ts: float) -> str:
+    minutos = int((time.time() - ts) // 60)
+    if minutos < 1: return "agora há pouco"
+    if minutos < 60: return f"há {minutos} min"
+    if minutos < 60 * 24: return f"há {minutos // 60} h"
+    return f"há {minutos // (60 * 24)} dias"
+
+@st.cache_data(ttl=300, show_spinner=False)
+def narracoes() -> dict:
+    # URLs versionadas da biblioteca de áudio pré-renderizada (id -> url)
+    try:
+        itens = backend_get("/biblioteca/audio")["itens"]
+    except Exception:
+        return {}
+    return {i["id"]: f"{BACKEND_PUBLIC_URL}{i['url']}" for i in itens if i["disponivel"]}
+
+def narracao(entrada_id: str):
+    # O navegador baixa direto do backend (cache imutável); sem áudio, o card fica só em texto
+    url = narracoes().get(entrada_id)
+    if url:
+        st.audio(url, format="audio/mpeg")
 
 # ================== PÁGINAS ==================
 PAGES = [
@@ -184,6 +275,7 @@ def page_boas_vindas():
          para criar seu perfil, analisar seu currículo, encontrar vagas compatíveis, preparar entrevistas e apoiar seu desenvolvimento contínuo —
          com foco em profissionais com deficiência visual.</p>
          """)
+    narracao("boas-vindas.saudacao")
     card("Como funciona",
          """
          <ul>
@@ -192,6 +284,7 @@ def page_boas_vindas():
            <li><b>Design sólido</b>: foco visível, contrastes e compatibilidade com leitores de tela.</li>
          </ul>
          """)
+    narracao("boas-vindas.como-funciona")
     st.markdown('<div class="grid-3">', unsafe_allow_html=True)
     card("Módulo 1 — Onboarding e Perfil",
          "<p>Cadastro guiado por voz, importação de currículo com IA e mapeamento de habilidades.</p>")
@@ -220,9 +313,13 @@ def page_home():
 
     st.markdown('<div class="grid-4">', unsafe_allow_html=True)
     kpi_chip("Progresso no Hub", "42%", "Módulos finalizados", percent=42)
-    kpi_chip("Entrevistas concluídas", "3", "Última há 2 dias")
+    analise = analise_entrevista(st.session_state.rt_client_id) or {}
+    ultima = analise.get("ultima")
+    kpi_chip("Entrevistas concluídas", str(analise.get("entrevistas", 0)),
+             f"Última {tempo_relativo(ultima['finalizada_em'])}" if ultima else "Nenhuma ainda")
     kpi_chip("Vagas alinhadas", "12", "Filtradas para seu perfil")
-    kpi_chip("Feedback médio", "8.5", "De 0 a 10")
+    nota = analise.get("nota_media")
+    kpi_chip("Feedback médio", f"{nota:.1f}" if nota is not None else "—", "De 0 a 10")
     st.markdown('</div>', unsafe_allow_html=True)
 
     col1, col2 = st.columns([1.7, 1])
@@ -230,10 +327,12 @@ def page_home():
         card("Próximas ações",
              "<ul><li>Concluir <b>Trilha ARIA Essentials</b> (15 min)</li><li>Agendar <b>simulação de entrevista</b></li><li>Atualizar <b>objetivo profissional</b></li></ul>",
              aria_label="Sugestões de próximas ações")
+        narracao("home.proximas-acoes")
     with col2:
         card("Lembretes",
              "<ul><li>Atualize o currículo (PDF acessível).</li><li>Revise portfólio com textos alternativos.</li><li>Revise portfólio com textos alternativos.</li></ul>",
              aria_label="Lembretes")
+        narracao("home.lembretes")
     st.markdown('</div>', unsafe_allow_html=True)
 
 # --------- Cadastro por Voz (Módulo 1) ----------
@@ -242,11 +341,29 @@ def page_cadastro():
 
     card("Assistente de Boas-Vindas (voz)",
          "<p>Durante o cadastro, o Farol guia você por voz e confirma cada etapa.</p>")
+    narracao("cadastro.boas-vindas")
+
+    # Campos extraídos do currículo: aplicados antes de o formulário criar os widgets
+    campos = st.session_state.pop("curriculo_campos", None)
+    if campos:
+        for chave, valor in campos.items():
+            if valor:
+                st.session_state[chave] = valor
+        st.success("Dados do currículo preenchidos. Confira e ajuste o formulário abaixo.")
 
     # Importação de currículo
     with st.expander("Importação Inteligente de Currículo (PDF/Word)"):
-        st.file_uploader("Envie seu currículo", type=["pdf","doc","docx"])
+        arquivo = st.file_uploader("Envie seu currículo", type=["pdf","doc","docx"],
+                                   help=f"PDF, DOC ou DOCX de até {st.get_option('server.maxUploadSize')} MB.")
         st.caption("A IA extrai dados e preenche seu perfil. Você confirma tudo por voz.")
+        if arquivo is not None and st.session_state.get("curriculo_arquivo") != arquivo.file_id:
+            try:
+                st.session_state.curriculo_importacao = backend_upload("/curriculo/importar", arquivo, arquivo.name)["id"]
+                st.session_state.curriculo_arquivo = arquivo.file_id
+            except Exception:
+                st.error("Não foi possível enviar o currículo agora. Tente novamente em instantes.")
+        if st.session_state.get("curriculo_importacao"):
+            curriculo_status()
 
     # Formulário rápido (conversacional simplificado)
     with st.form("cadastro_voz"):
@@ -256,6 +373,9 @@ def page_cadastro():
         st.multiselect("Necessidades de acessibilidade", ["Leitor de tela","Alto contraste","Navegação por voz","Subtítulos automáticos"], key="cad_acess")
         st.text_area("Resumo da experiência", height=160, key="cad_exp")
         if st.form_submit_button("Salvar e continuar"):
+            # Fora das chaves de widget: sobrevive à troca de página e alimenta o match das vagas
+            st.session_state.perfil = {"cargo": st.session_state.cad_cargo, "experiencia": st.session_state.cad_exp,
+                                       "acessibilidade": tuple(st.session_state.cad_acess)}
             st.success("Cadastro salvo!")
 
     st.markdown('<div class="grid-2">', unsafe_allow_html=True)
@@ -265,21 +385,67 @@ def page_cadastro():
          "<p>Identificação de soft/hard skills + questionário adaptativo por voz para entender preferências.</p>")
     st.markdown('</div></div>', unsafe_allow_html=True)
 
+@st.fragment(run_every=1.5)
+def curriculo_status():
+    # Só este trecho reexecuta enquanto a extração roda; ao concluir, um rerun completo preenche o formulário
+    importacao = st.session_state.get("curriculo_importacao")
+    if not importacao:
+        return
+    try:
+        res = backend_get(f"/curriculo/{importacao}")
+    except Exception:
+        st.warning("Aguardando o servidor para ler o currículo…")
+        return
+    if res["status"] == "processando":
+        st.markdown('<p role="status">Lendo seu currículo…</p>', unsafe_allow_html=True)
+    elif res["status"] == "erro":
+        st.session_state.curriculo_importacao = None
+        st.error(res.get("erro") or "Não foi possível ler o currículo.")
+    else:
+        st.session_state.curriculo_importacao = None
+        st.session_state.curriculo_campos = res["campos"]
+        st.rerun()
+
 # --------- Vagas & Match (Módulo 2) ----------
+TODAS = "Todas"
+
 def page_vagas():
     st.markdown('<div class="page-container stack"><h1 class="page-title">Busca de Vagas</h1>', unsafe_allow_html=True)
     card("Busca 100% por voz",
          '<p>Diga: <i>“Farol, buscar vagas de analista de marketing remoto em São Paulo.”</i></p>'
          "<p>Use os filtros abaixo para refinar resultados.</p>")
+    try:
+        facetas = vagas_facetas()
+    except Exception:
+        st.error("Não foi possível carregar o catálogo de vagas agora. Tente novamente em instantes.")
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+    q = st.text_input("Buscar", placeholder="Ex.: analista de marketing São Paulo", key="vagas_q")
     colf = st.columns(4)
-    with colf[0]: st.selectbox("Área", ["Desenvolvimento","QA","Design","Dados"])
-    with colf[1]: st.selectbox("Nível", ["Júnior","Pleno","Sênior"])
-    with colf[2]: st.selectbox("Modelo", ["Remoto","Híbrido","Presencial"])
-    with colf[3]: st.multiselect("Acessibilidade", ["Leitor de tela","Alto contraste","Navegação por voz"])
-    st.write("")
+    with colf[0]: area = st.selectbox("Área", [TODAS, *facetas["area"]], key="vagas_area")
+    with colf[1]: nivel = st.selectbox("Nível", [TODAS, *facetas["nivel"]], key="vagas_nivel")
+    with colf[2]: modelo = st.selectbox("Modelo", [TODAS, *facetas["modelo"]], key="vagas_modelo")
+    with colf[3]: acess = st.multiselect("Acessibilidade", facetas["acessibilidade"], key="vagas_acess")
+    page = int(st.number_input("Página", min_value=1, value=1, step=1, key="vagas_page"))
+    try:
+        res = buscar_vagas(q.strip(), area, nivel, modelo, tuple(acess), page)
+    except Exception:
+        st.error("A busca de vagas falhou. Tente novamente em instantes.")
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+    # Resumo em texto para leitores de tela antes da lista
+    st.markdown(f'<p role="status">{res["total"]} vagas encontradas · página {res["page"]}</p>', unsafe_allow_html=True)
+    # Compatibilidade só quando há perfil salvo no Cadastro (uma chamada para a página inteira)
+    matches = {}
+    perfil = st.session_state.get("perfil")
+    if perfil and res["items"]:
+        with suppress(Exception):
+            matches = pontuar_vagas(perfil["cargo"], perfil["experiencia"], perfil["acessibilidade"],
+                                    tuple(v["id"] for v in res["items"]))
     st.markdown('<div class="grid-2">', unsafe_allow_html=True)
-    for i in range(1,7):
-        job_card(i, match=70+i*3%25+60, selo=(i%2==0))
+    for vaga in res["items"]:
+        m = matches.get(vaga["id"])
+        job_card(vaga, match=m["compatibilidade"] if m else None, explicacao=m["explicacao"] if m else "")
     st.markdown('</div></div>', unsafe_allow_html=True)
 
 # --------- Desenvolvimento (Módulo 3) ----------
@@ -302,23 +468,92 @@ def page_hub():
     st.markdown('</div></div>', unsafe_allow_html=True)
 
 # --------- Entrevista (Realtime) (NÃO alterar) ----------
+ENTREVISTA = "Entrevista (Realtime)"
+
 def page_entrevista():
     st.markdown('<div class="page-container stack"><h1 class="page-title">Simulador de Entrevistas (voz em tempo real)</h1>', unsafe_allow_html=True)
     cc = st.columns([1.5,1])
     with cc[0]:
-        st.markdown(f"""
-<section class="card" role="region" aria-label="Simulador"><div class="content">
-  <iframe src="{BACKEND_PUBLIC_URL}/webrtc" title="Farol Realtime" width="100%" height="380"
-          style="border-radius:10px;border:2px solid var(--edge); background: var(--panel);"
-          allow="microphone; autoplay; clipboard-read; clipboard-write"></iframe>
-  <p>Se o áudio não tocar, clique na página para liberar o autoplay do navegador.
-     <a href="{BACKEND_PUBLIC_URL}/webrtc">Abrir em nova aba</a>.</p>
-</div></section>""", unsafe_allow_html=True)
+        if st.session_state.voz_ativa:
+            card("Conversa em andamento",
+                 "<p>O Farol está na barra lateral, em <b>Farol por voz</b>. A conversa continua ativa ao trocar de página; "
+                 "use <b>Encerrar conversa</b> para desligar o microfone.</p>"
+                 f'<p>Se o áudio não tocar, clique no widget para liberar o autoplay do navegador. <a href="{BACKEND_PUBLIC_URL}/webrtc">Abrir em nova aba</a>.</p>')
+        else:
+            if st.button("🎙️ Iniciar conversa por voz", use_container_width=True):
+                st.session_state.voz_ativa = True
+                st.rerun()
     with cc[1]:
         card("Dicas de uso",
-             "<ul><li>Permita o microfone quando solicitado.</li><li>Use fones para evitar eco.</li><li>Pressione TAB para navegar pelos controles.</li></ul>")
+             "<ul><li>Permita o microfone quando solicitado.</li><li>Use fones para evitar eco.</li><li>Pressione TAB para navegar pelos controles.</li>"
+             "<li>Diga <i>“abrir vagas”</i>, <i>“buscar vagas de QA remoto”</i> ou <i>“aumentar a fonte”</i> para comandar a plataforma; "
+             "o comando é aplicado em até meio segundo.</li></ul>")
     st.markdown('</div>', unsafe_allow_html=True)
 
+def painel_voz():
+    """Widget realtime persistente: renderizado sempre na mesma posição da sidebar e
+    com o mesmo HTML, o navegador mantém o iframe (e a conexão) entre páginas."""
+    # Entrar na página de Entrevista abre a conversa; sair dela não fecha
+    if st.session_state.page == ENTREVISTA and st.session_state.get("pagina_voz") != ENTREVISTA:
+        st.session_state.voz_ativa = True
+    st.session_state.pagina_voz = st.session_state.page
+    # Só a fala na página Entrevista entra na análise (comandos e conversa nas outras páginas, não)
+    em_entrevista = st.session_state.page == ENTREVISTA
+    if st.session_state.get("modo_analise") != em_entrevista:
+        with suppress(Exception):
+            backend_post(f"/analise/{st.session_state.rt_client_id}/modo", {"entrevista": em_entrevista}, timeout=2.0)
+            st.session_state.modo_analise = em_entrevista
+    if not st.session_state.voz_ativa:
+        return
+    st.markdown(f"""
+<section class="card" role="region" aria-label="Farol por voz"><div class="content">
+  <p><strong>🎙️ Farol por voz</strong></p>
+  <iframe src="{BACKEND_PUBLIC_URL}/webrtc?client_id={st.session_state.rt_client_id}" title="Farol Realtime" width="100%" height="380"
+          style="border-radius:10px;border:2px solid var(--edge); background: var(--panel);"
+          allow="microphone; autoplay; clipboard-read; clipboard-write"></iframe>
+</div></section>""", unsafe_allow_html=True)
+    if st.button("Encerrar conversa", key="voz_encerrar", use_container_width=True):
+        st.session_state.voz_ativa = False
+        st.rerun()
+    comandos_voz_pendentes()
+
+# Comandos de voz resolvidos pelo roteador local do backend (/comandos) durante a chamada
+def aplicar_comando(cmd: dict):
+    if cmd["intencao"] == "navegar":
+        st.session_state.page = cmd["pagina"]
+        st.session_state.nav_comando = True
+    elif cmd["intencao"] == "buscar_vagas":
+        filtros = cmd.get("filtros") or {}
+        # A página Vagas não tem filtro de cidade: ela entra no texto (o índice busca por local)
+        st.session_state.vagas_q = " ".join(t for t in (cmd.get("q"), filtros.get("local")) if t)
+        for chave in ("area", "nivel", "modelo"):
+            st.session_state[f"vagas_{chave}"] = filtros.get(chave, TODAS)
+        st.session_state.vagas_acess = filtros.get("acessibilidade", [])
+        st.session_state.pop("vagas_page", None)
+        st.session_state.page = "Vagas"
+        st.session_state.nav_comando = True
+    elif cmd["acao"] == "zoom":
+        passo = {"mais": 0.125, "menos": -0.125}.get(cmd["valor"])
+        st.session_state.zoom = 1.125 if passo is None else min(2.0, max(1.0, round(st.session_state.zoom + passo, 3)))
+    elif cmd["acao"] == "alto_contraste":
+        st.session_state.high_contrast = bool(cmd["valor"])
+    elif cmd["acao"] == "tema":
+        st.session_state.mode = cmd["valor"]
+    elif cmd["acao"] == "reduzir_animacoes":
+        st.session_state.reduce_motion = bool(cmd["valor"])
+
+@st.fragment(run_every=0.5)
+def comandos_voz_pendentes():
+    # Só este trecho reexecuta a cada 0,5 s (o atraso médio de um comando é ~0,25 s);
+    # um comando dispara o rerun completo
+    try:
+        cmd = backend_get(f"/comandos/{st.session_state.rt_client_id}/pendente", timeout=2.0)["comando"]
+    except Exception:
+        return
+    if cmd:
+        aplicar_comando(cmd)
+        st.rerun()
+
 # --------- Simulação em andamento ----------
 def page_simulacao():
     st.markdown('<div class="page-container stack"><h1 class="page-title">Simulação em andamento</h1>', unsafe_allow_html=True)
@@ -328,12 +563,26 @@ def page_simulacao():
 # --------- Feedback ----------
 def page_feedback():
     st.markdown('<div class="page-container stack"><h1 class="page-title">Feedback da Simulação</h1>', unsafe_allow_html=True)
+    analise = analise_entrevista(st.session_state.rt_client_id) or {}
+    r = analise.get("ultima")
+    if not r:
+        card("Sem simulações ainda",
+             "<p>Faça uma entrevista na página <b>Entrevista (Realtime)</b>. O feedback aparece aqui segundos depois de encerrar a chamada.</p>")
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+    lista = lambda itens: "<ul>" + "".join(f"<li>{html.escape(i)}</li>" for i in itens) + "</ul>" if itens else "<p>—</p>"
     c1, c2 = st.columns(2)
     with c1:
-        card("Pontos fortes", "<ul><li>Comunicação clara</li><li>Conceitos ARIA corretos</li><li>Boa senioridade em testes</li></ul>")
+        card("Pontos fortes", lista(r["pontos_fortes"]))
     with c2:
-        card("Oportunidades de melhoria", "<ul><li>Estruturar STAR</li><li>Detalhar métricas de impacto</li><li>Explicar trade-offs</li></ul>")
-    st.markdown('</div>', unsafe_allow_html=True)
+        card("Oportunidades de melhoria", lista(r["melhorias"]))
+    pausas = r["pausas"]
+    st.markdown('<div class="grid-4">', unsafe_allow_html=True)
+    kpi_chip("Nota da simulação", f"{r['nota']:.1f}" if r["nota"] is not None else "—", "De 0 a 10")
+    kpi_chip("Ritmo", f"{r['palavras_por_minuto']:.0f} ppm", "Palavras por minuto (estimativa)")
+    kpi_chip("Pausas", str(pausas["total"]), f"Média {pausas['media_s']:.1f} s · {pausas['longas']} longas")
+    kpi_chip("Hesitações", f"{100 * r['hesitacao_ratio']:.0f}%", f"Do tempo de fala · variação de voz {r['variabilidade_energia_db']:.1f} dB")
+    st.markdown('</div></div>', unsafe_allow_html=True)
 
 # --------- Portfólio (Módulo 5) ----------
 def page_portfolio():
@@ -360,14 +609,24 @@ def page_biblioteca():
     st.markdown('<div class="page-container stack"><h1 class="page-title">Biblioteca de Direitos e Legislação</h1>', unsafe_allow_html=True)
     card("Conteúdos em áudio",
          "<p>Resumos em áudio e texto sobre leis e direitos trabalhistas voltados à empregabilidade inclusiva.</p>")
-    st.markdown('<div class="grid-3">', unsafe_allow_html=True)
-    card("Lei de Cotas", "<p>Resumo acessível e exemplos práticos de aplicação.</p>")
-    card("Acessibilidade no trabalho", "<p>Direitos a adaptações razoáveis e tecnologias assistivas.</p>")
-    card("Recursos e canais", "<p>Instituições e serviços de apoio ao trabalhador com deficiência.</p>")
-    st.markdown('</div></div>', unsafe_allow_html=True)
+    narracao("biblioteca.introducao")
+    cols = st.columns(3)
+    for col, (entrada_id, titulo, resumo) in zip(cols, [
+        ("biblioteca.lei-de-cotas", "Lei de Cotas", "Resumo acessível e exemplos práticos de aplicação."),
+        ("biblioteca.acessibilidade-no-trabalho", "Acessibilidade no trabalho", "Direitos a adaptações razoáveis e tecnologias assistivas."),
+        ("biblioteca.recursos-e-canais", "Recursos e canais", "Instituições e serviços de apoio ao trabalhador com deficiência."),
+    ]):
+        with col:
+            card(titulo, f"<p>{resumo}</p>")
+            narracao(entrada_id)
+    st.markdown('</div>', unsafe_allow_html=True)
 
 # ================== SIDEBAR ==================
+# Fragmento: mexer em zoom/contraste reexecuta só este bloco (controles + CSS do
+# tema), sem reconstruir a página nem remontar o iframe da entrevista.
+@st.fragment
 def a11y_controls_sidebar():
+    started = time.perf_counter()
     st.markdown('<span class="sb-badge">🧭 Farol — Plataforma</span>', unsafe_allow_html=True)
     # Acessibilidade compacta
     with st.expander("Acessibilidade", expanded=False):
@@ -376,13 +635,17 @@ def a11y_controls_sidebar():
         st.session_state.high_contrast = st.toggle("Alto contraste", value=st.session_state.high_contrast)
         c1,c2,c3 = st.columns(3)
         with c1:
-            if st.button("A−"): st.session_state.zoom = max(1.0, round(st.session_state.zoom-0.125,3)); st.rerun()
+            if st.button("A−"): st.session_state.zoom = max(1.0, round(st.session_state.zoom-0.125,3))
         with c2:
-            if st.button("Reset"): st.session_state.zoom = 1.125; st.rerun()
+            if st.button("Reset"): st.session_state.zoom = 1.125
         with c3:
-            if st.button("A+"): st.session_state.zoom = min(2.0, round(st.session_state.zoom+0.125,3)); st.rerun()
+            if st.button("A+"): st.session_state.zoom = min(2.0, round(st.session_state.zoom+0.125,3))
         st.session_state.reduce_motion = st.toggle("Reduzir animações", value=st.session_state.reduce_motion)
-    
+    # <style> vale para a página toda, mesmo emitido na sidebar; vem depois dos
+    # controles para já refletir o clique desta execução
+    inject_theme_css(st.session_state.zoom, st.session_state.mode, st.session_state.high_contrast, st.session_state.reduce_motion)
+    record_run_timing("fragmento a11y", started)
+
 
 def sidebar_nav():
     use_option_menu = False
@@ -405,9 +668,13 @@ def sidebar_nav():
             "record-circle",   # Simulação
             "bar-chart"        # Feedback
         ]
+        nomes = [n for n,_ in PAGES]
+        # Navegação por comando de voz: o menu guarda a própria seleção, então é forçada aqui
+        manual = nomes.index(st.session_state.page) if st.session_state.pop("nav_comando", False) else None
         current = option_menu(
-            menu_title=None, options=[n for n,_ in PAGES], icons=icons,
-            default_index=[n for n,_ in PAGES].index(st.session_state.page),
+            menu_title=None, options=nomes, icons=icons,
+            default_index=nomes.index(st.session_state.page),
+            manual_select=manual, key="nav_menu",
             orientation="vertical",
             styles={
                 "container": {"padding": "0px 0 0px 0","background-color":"var(--panel)","border-right":"3px solid var(--edge)"},
@@ -418,15 +685,27 @@ def sidebar_nav():
                 "icon": {"color":"var(--accent)"},
             },
         )
-        if current != st.session_state.page:
-            st.session_state.page = current; st.rerun()
+        # A página é lida depois da sidebar: atualizar o estado basta, sem st.rerun() extra
+        st.session_state.page = current
     else:
         for name, icon in PAGES:
             st.markdown('<div class="nav-btn">', unsafe_allow_html=True)
             if st.button(f"{icon}  {name}", key=f"navbtn_{name}", use_container_width=True):
-                st.session_state.page = name; st.rerun()
+                st.session_state.page = name
             st.markdown('</div>', unsafe_allow_html=True)
 
+# ============= profiling de reruns (?profile=1) =============
+PROFILE_RERUNS = os.getenv("FAROL_PROFILE_RERUNS") == "1"
+
+def record_run_timing(kind: str, started: float):
+    if not (PROFILE_RERUNS or st.query_params.get("profile") == "1"):
+        return
+    ms = (time.perf_counter() - started) * 1000
+    runs = st.session_state.setdefault("run_timings", [])
+    runs.append((kind, ms))
+    del runs[:-20]
+    st.caption(f"⏱️ {kind}: {ms:.1f} ms · últimas {len(runs)}: média {sum(m for _, m in runs) / len(runs):.1f} ms")
+
   
    
 
@@ -435,7 +714,8 @@ st.markdown('<a href="#conteudo-principal" class="skip-link">Pular para conteúd
 with st.sidebar:
     a11y_controls_sidebar()
     sidebar_nav()
-inject_theme_css(st.session_state.zoom, st.session_state.mode, st.session_state.high_contrast, st.session_state.reduce_motion)
+    # Depois da navegação: a página atual já está decidida e a posição não muda entre reruns
+    painel_voz()
 
 # Região viva p/ leitores de tela
 sr = st.empty()
@@ -451,7 +731,8 @@ elif page == "Hub de Desenvolvimento": page_hub()
 elif page == "Portfólio de Acessibilidade": page_portfolio()
 elif page == "Comunidade": page_comunidade()
 elif page == "Biblioteca": page_biblioteca()
-elif page == "Entrevista (Realtime)": page_entrevista()
+elif page == ENTREVISTA: page_entrevista()
 elif page == "Simulação em Andamento": page_simulacao()
 elif page == "Feedback": page_feedback()
 st.markdown('</main>', unsafe_allow_html=True)
+record_run_timing("rerun completo", _RUN_STARTED)